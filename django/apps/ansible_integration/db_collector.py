@@ -0,0 +1,314 @@
+"""
+Long-lived database metrics collector.
+
+Replaces the per-cycle postgresql_query / mysql_query / sqlplus calls of
+database_metrics.yml: one async connection pool is kept per target database,
+all targets are probed concurrently with a per-target timeout and the
+results are written in a single batch.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import yaml
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.core.cache import ALL_GROUPS, bump_version
+from apps.core.models import System, Metric, Log
+
+logger = logging.getLogger(__name__)
+
+# Same reference size the playbook used to turn bytes into a percentage (100 GB)
+DISK_REFERENCE_BYTES = 100 * 1024 ** 3
+
+POSTGRESQL_ACTIVITY_QUERY = """
+    SELECT
+        count(*) FILTER (WHERE state = 'active') AS active_connections,
+        count(*) AS total_connections,
+        (SELECT CASE WHEN blks_hit + blks_read > 0
+                THEN round(blks_hit * 100.0 / (blks_hit + blks_read), 2)
+                ELSE 0 END
+         FROM pg_stat_database WHERE datname = current_database()) AS cache_hit_ratio
+    FROM pg_stat_activity
+"""
+POSTGRESQL_SIZE_QUERY = "SELECT pg_database_size(current_database())"
+
+MYSQL_CONNECTIONS_QUERY = (
+    "SELECT VARIABLE_VALUE FROM performance_schema.global_status "
+    "WHERE VARIABLE_NAME = 'Threads_connected'"
+)
+MYSQL_SIZE_QUERY = (
+    "SELECT COALESCE(SUM(data_length + index_length), 0) FROM information_schema.TABLES"
+)
+
+ORACLE_SESSIONS_QUERY = "SELECT count(*) FROM v$session WHERE status = 'ACTIVE'"
+
+
+@dataclass
+class DatabaseTarget:
+    """A database reachable by the collector."""
+    name: str
+    system_id: int
+    db_type: str
+    host: str
+    port: int
+    user: str
+    password: Optional[str] = None
+    database: Optional[str] = None
+    oracle_sid: str = 'ORCL'
+
+    # Expensive size probes are cached between cycles
+    size_bytes: int = 0
+    size_checked_at: float = field(default=0.0, repr=False)
+
+
+def load_targets(inventory_path=None) -> List[DatabaseTarget]:
+    """
+    Build collector targets from the `databases` group of the inventory.
+
+    Passwords that are Ansible templates (vault references) cannot be
+    resolved here and are looked up in settings.DB_COLLECTOR_PASSWORDS.
+    """
+    inventory_path = inventory_path or settings.ANSIBLE_INVENTORY_DIR / 'hosts.yml'
+
+    with open(inventory_path) as f:
+        inventory = yaml.safe_load(f) or {}
+
+    hosts = (
+        inventory.get('all', {}).get('children', {}).get('databases', {}) or {}
+    ).get('hosts') or {}
+
+    targets = []
+    for name, host_vars in hosts.items():
+        host_vars = host_vars or {}
+        if 'system_id' not in host_vars:
+            logger.warning(f"Skipping database {name}: no system_id in inventory")
+            continue
+
+        db_type = host_vars.get('db_type', 'postgresql')
+        password = host_vars.get('ansible_password')
+        if password is None or '{{' in str(password):
+            password = settings.DB_COLLECTOR_PASSWORDS.get(name)
+
+        targets.append(DatabaseTarget(
+            name=name,
+            system_id=int(host_vars['system_id']),
+            db_type=db_type,
+            host=host_vars.get('ansible_host', name),
+            port=int(host_vars.get('db_port', {'mysql': 3306, 'oracle': 1521}.get(db_type, 5432))),
+            user=host_vars.get('ansible_user', 'postgres'),
+            password=password,
+            database=host_vars.get('db_name'),
+            oracle_sid=host_vars.get('oracle_sid', 'ORCL'),
+        ))
+
+    return targets
+
+
+def _percentage(value) -> Decimal:
+    """Clamp a value into the 0-100 range of the metric fields."""
+    return Decimal(str(round(min(max(float(value or 0), 0.0), 100.0), 2)))
+
+
+class DatabaseCollector:
+    """
+    Keeps one connection pool per target and probes them concurrently.
+    """
+
+    def __init__(self, targets: List[DatabaseTarget], timeout=None, pool_size=None,
+                 size_interval=None):
+        self.targets = targets
+        self.timeout = timeout or settings.DB_COLLECTOR_TIMEOUT
+        self.pool_size = pool_size or settings.DB_COLLECTOR_POOL_SIZE
+        self.size_interval = size_interval or settings.DB_COLLECTOR_SIZE_INTERVAL
+        self._pools: Dict[str, Any] = {}
+
+    async def _get_pool(self, target: DatabaseTarget):
+        """Create the pool for a target on first use and reuse it afterwards."""
+        pool = self._pools.get(target.name)
+        if pool is not None:
+            return pool
+
+        if target.db_type == 'postgresql':
+            import asyncpg
+            pool = await asyncpg.create_pool(
+                host=target.host, port=target.port, user=target.user,
+                password=target.password, database=target.database or 'postgres',
+                min_size=1, max_size=self.pool_size,
+                command_timeout=self.timeout,
+            )
+        elif target.db_type == 'mysql':
+            import aiomysql
+            pool = await aiomysql.create_pool(
+                host=target.host, port=target.port, user=target.user,
+                password=target.password or '', db=target.database,
+                minsize=1, maxsize=self.pool_size, autocommit=True,
+            )
+        elif target.db_type == 'oracle':
+            import oracledb
+            pool = oracledb.create_pool_async(
+                user=target.user, password=target.password,
+                dsn=f"{target.host}:{target.port}/{target.oracle_sid}",
+                min=1, max=self.pool_size,
+            )
+        else:
+            raise ValueError(f"Unsupported db_type: {target.db_type}")
+
+        self._pools[target.name] = pool
+        return pool
+
+    def _size_is_stale(self, target: DatabaseTarget) -> bool:
+        return time.monotonic() - target.size_checked_at >= self.size_interval
+
+    async def _probe_postgresql(self, target: DatabaseTarget) -> Dict[str, Any]:
+        pool = await self._get_pool(target)
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(POSTGRESQL_ACTIVITY_QUERY)
+            if self._size_is_stale(target):
+                target.size_bytes = await conn.fetchval(POSTGRESQL_SIZE_QUERY)
+                target.size_checked_at = time.monotonic()
+
+        return {
+            'cpu_usage': _percentage(row['cache_hit_ratio']),
+            'memory_usage': _percentage(row['total_connections'] * 2),
+            'disk_usage': _percentage(target.size_bytes * 100 / DISK_REFERENCE_BYTES),
+            'network_in': row['active_connections'],
+            'network_out': 0,
+        }
+
+    async def _probe_mysql(self, target: DatabaseTarget) -> Dict[str, Any]:
+        pool = await self._get_pool(target)
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(MYSQL_CONNECTIONS_QUERY)
+                connections = int((await cursor.fetchone())[0])
+                if self._size_is_stale(target):
+                    await cursor.execute(MYSQL_SIZE_QUERY)
+                    target.size_bytes = int((await cursor.fetchone())[0])
+                    target.size_checked_at = time.monotonic()
+
+        return {
+            'cpu_usage': _percentage(0),
+            'memory_usage': _percentage(connections),
+            'disk_usage': _percentage(target.size_bytes * 100 / DISK_REFERENCE_BYTES),
+            'network_in': connections,
+            'network_out': 0,
+        }
+
+    async def _probe_oracle(self, target: DatabaseTarget) -> Dict[str, Any]:
+        pool = await self._get_pool(target)
+        async with pool.acquire() as conn:
+            with conn.cursor() as cursor:
+                await cursor.execute(ORACLE_SESSIONS_QUERY)
+                sessions = int((await cursor.fetchone())[0])
+
+        return {
+            'cpu_usage': _percentage(0),
+            'memory_usage': _percentage(0),
+            'disk_usage': _percentage(0),
+            'network_in': sessions,
+            'network_out': 0,
+        }
+
+    async def _probe(self, target: DatabaseTarget) -> Optional[Dict[str, Any]]:
+        """Probe one target, never raising so one bad database can't stop the cycle."""
+        probe = getattr(self, f'_probe_{target.db_type}', None)
+        if probe is None:
+            logger.error(f"Unsupported db_type for {target.name}: {target.db_type}")
+            return None
+
+        try:
+            return await asyncio.wait_for(probe(target), timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Database probe failed for {target.name}: {e!r}")
+            # Drop the pool so the next cycle reconnects from scratch
+            await self._close_pool(target.name)
+            return None
+
+    async def collect_once(self) -> Dict[str, int]:
+        """Probe every target concurrently and store the results in one batch."""
+        results = await asyncio.gather(*(self._probe(t) for t in self.targets))
+
+        collected = [
+            (target, values) for target, values in zip(self.targets, results)
+            if values is not None
+        ]
+        failed = [target for target, values in zip(self.targets, results) if values is None]
+
+        await sync_to_async(self._store, thread_sensitive=True)(collected, failed)
+
+        return {'collected': len(collected), 'failed': len(failed)}
+
+    @staticmethod
+    def _store(collected, failed):
+        """Write metrics and logs for a whole cycle with bulk queries."""
+        if collected:
+            Metric.objects.bulk_create([
+                Metric(system_id=target.system_id, **values)
+                for target, values in collected
+            ])
+            System.objects.filter(
+                id__in=[target.system_id for target, _ in collected]
+            ).update(last_seen=timezone.now(), status='online')
+
+        if failed:
+            Log.objects.bulk_create([
+                Log(
+                    system_id=target.system_id,
+                    level='error',
+                    message=f'Database metrics collection failed for {target.name} ({target.db_type})',
+                    source='db_collector'
+                )
+                for target in failed
+            ])
+
+        if collected or failed:
+            bump_version(*ALL_GROUPS)
+
+    async def run_forever(self, interval=None):
+        """
+        Collect every `interval` seconds, keeping pools open between cycles.
+
+        A failed cycle (e.g. Postgres restarting) is logged and the loop goes
+        on; like a request, each cycle starts by dropping the Django
+        connection if it is broken or older than CONN_MAX_AGE.
+        """
+        interval = interval or settings.DB_COLLECTOR_INTERVAL
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    await sync_to_async(close_old_connections, thread_sensitive=True)()
+                    summary = await self.collect_once()
+                    logger.info(f"Database collection cycle finished: {summary}")
+                except Exception:
+                    logger.exception("Database collection cycle failed")
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+        finally:
+            await self.close()
+
+    async def _close_pool(self, name):
+        pool = self._pools.pop(name, None)
+        if pool is None:
+            return
+        try:
+            # asyncpg/oracledb close() is a coroutine, aiomysql uses wait_closed()
+            result = pool.close()
+            if inspect.isawaitable(result):
+                await result
+            if hasattr(pool, 'wait_closed'):
+                await pool.wait_closed()
+        except Exception:
+            logger.exception(f"Error closing pool for {name}")
+
+    async def close(self):
+        """Close every pool."""
+        for name in list(self._pools):
+            await self._close_pool(name)
@@ -0,0 +1,150 @@
+"""
+Singleton locks for Celery tasks.
+
+Beat triggers a collection every 5 minutes whether or not the previous one
+finished. Each run takes an expiring Redis lock per task and host group,
+kept alive by a heartbeat thread, and triggers that find it held are
+skipped and counted.
+"""
+import logging
+import threading
+import uuid
+from contextlib import contextmanager
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = 'task_locks'
+STATS_KEY = f'{LOCK_PREFIX}:stats'
+
+# Extend / release only while the lock still belongs to this run
+EXTEND_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_client = None
+
+
+def get_client():
+    """Client created on first use, so each forked worker gets its own pool."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.TASK_LOCK_REDIS_URL, decode_responses=True)
+    return _client
+
+
+class TaskLock:
+    """
+    Expiring lock for one task and host group.
+
+    If the worker dies the heartbeat stops and the lock expires after
+    TASK_LOCK_TTL seconds, so a crash never blocks the next cycle for long.
+    """
+
+    def __init__(self, task, group, ttl=None):
+        self.key = f'{LOCK_PREFIX}:{task}:{group}'
+        self.stat_prefix = f'{task}:{group}'
+        self.token = uuid.uuid4().hex
+        self.ttl_ms = (ttl or settings.TASK_LOCK_TTL) * 1000
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _count(self, event):
+        get_client().hincrby(STATS_KEY, f'{self.stat_prefix}:{event}', 1)
+
+    def acquire(self):
+        """Take the lock, or return False if another run holds it."""
+        acquired = bool(get_client().set(self.key, self.token, nx=True, px=self.ttl_ms))
+        self._count('acquired' if acquired else 'skipped')
+
+        if acquired:
+            self._thread = threading.Thread(
+                target=self._heartbeat, name=f'heartbeat-{self.key}', daemon=True
+            )
+            self._thread.start()
+        return acquired
+
+    def _heartbeat(self):
+        extend = get_client().register_script(EXTEND_SCRIPT)
+        interval = self.ttl_ms / 1000 / 3
+
+        while not self._stop.wait(interval):
+            try:
+                if not extend(keys=[self.key], args=[self.token, self.ttl_ms]):
+                    # Expired or taken over: another run may already be going
+                    self.lost = True
+                    self._count('lost')
+                    logger.warning(f"Lost lock {self.key} while the task was running")
+                    return
+            except redis.RedisError as e:
+                logger.warning(f"Could not extend lock {self.key}: {e!r}")
+
+    def release(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        get_client().register_script(RELEASE_SCRIPT)(keys=[self.key], args=[self.token])
+
+
+@contextmanager
+def singleton(task, group):
+    """
+    Run a block at most once at a time per task and host group.
+
+    Yields False when a previous run still holds the lock; its work is
+    covered by that run, so the caller just returns skipped_result().
+    """
+    lock = TaskLock(task, group)
+    if not lock.acquire():
+        logger.info(f"Skipping {task} for {group}: previous run still in progress")
+        yield False
+        return
+
+    try:
+        yield True
+    finally:
+        lock.release()
+
+
+def skipped_result(task, group):
+    """Celery result of a run skipped because of an overlap."""
+    return {'status': 'skipped', 'reason': 'overlap', 'task': task, 'group': group}
+
+
+def get_lock_stats():
+    """
+    Runs per task and host group: started, skipped because the previous run
+    was still going, locks lost mid-run and whether one is running now.
+    """
+    client = get_client()
+    counters = client.hgetall(STATS_KEY)
+    running = {
+        key[len(LOCK_PREFIX) + 1:]
+        for key in client.scan_iter(match=f'{LOCK_PREFIX}:*')
+        if key != STATS_KEY
+    }
+
+    stats = {}
+    for field, value in counters.items():
+        name, _, event = field.rpartition(':')
+        entry = stats.setdefault(name, {'acquired': 0, 'skipped': 0, 'lost': 0})
+        entry[event] = int(value)
+
+    for name, entry in stats.items():
+        entry['running'] = name in running
+    for name in running:
+        stats.setdefault(name, {'acquired': 0, 'skipped': 0, 'lost': 0, 'running': True})
+
+    return stats
@@ -0,0 +1,37 @@
+"""
+Run the long-lived database metrics collector.
+"""
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from apps.ansible_integration.db_collector import DatabaseCollector, load_targets
+
+
+class Command(BaseCommand):
+    help = 'Collect database metrics continuously using pooled async connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=None,
+                            help='Seconds between collection cycles')
+        parser.add_argument('--once', action='store_true',
+                            help='Run a single collection cycle and exit')
+
+    def handle(self, *args, **options):
+        targets = load_targets()
+        self.stdout.write(f"Collecting metrics from {len(targets)} database(s)")
+
+        collector = DatabaseCollector(targets)
+
+        if options['once']:
+            summary = asyncio.run(self._run_once(collector))
+            self.stdout.write(self.style.SUCCESS(f"Collection finished: {summary}"))
+        else:
+            asyncio.run(collector.run_forever(options['interval']))
+
+    @staticmethod
+    async def _run_once(collector):
+        try:
+            return await collector.collect_once()
+        finally:
+            await collector.close()
@@ -0,0 +1,45 @@
+"""
+Compact Celery results for ansible-runner runs.
+
+Only host counts per status, the duration and the failed hosts go to the
+result backend; the full events and stdout stay in the run's artifact
+directory (ANSIBLE_RUNNER_DIR/artifacts/<artifact_id>).
+"""
+import uuid
+
+from django.conf import settings
+
+# ansible-runner stats: status -> {host: count}
+STAT_KEYS = ('ok', 'changed', 'failures', 'dark', 'skipped', 'ignored', 'rescued')
+
+
+def new_artifact_id():
+    """Run ident: names the run's directory in the artifact store."""
+    return uuid.uuid4().hex
+
+
+def runner_options(artifact_id):
+    """Common ansible_runner.run() arguments (keeps the newest runs on disk)."""
+    return {
+        'private_data_dir': str(settings.ANSIBLE_RUNNER_DIR),
+        'ident': artifact_id,
+        'rotate_artifacts': settings.ANSIBLE_ARTIFACTS_KEEP,
+    }
+
+
+def summarize_run(runner, artifact_id, duration):
+    """Counts per status, duration and failed hosts of a run."""
+    stats = runner.stats or {}
+    failed_hosts = sorted(set(stats.get('failures') or {}) | set(stats.get('dark') or {}))
+    max_hosts = settings.TASK_RESULT_MAX_HOSTS
+
+    return {
+        'runner_status': runner.status,
+        'rc': runner.rc,
+        'duration': round(duration, 2),
+        'hosts': len(stats.get('processed') or {}),
+        'counts': {key: len(stats.get(key) or {}) for key in STAT_KEYS},
+        'failed_hosts': failed_hosts[:max_hosts],
+        'failed_hosts_truncated': len(failed_hosts) > max_hosts,
+        'artifact_id': artifact_id,
+    }
@@ -5,14 +5,17 @@ import ansible_runner
 from celery import shared_task
 from django.conf import settings
 from apps.core.models import System, Metric, Log
+from .locks import singleton, skipped_result
+from .results import new_artifact_id, runner_options, summarize_run
 import logging
 import json
+import time
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(bind=True, max_retries=3)
-def collect_linux_metrics(self):
+@shared_task
+def collect_linux_metrics():
     """
     Execute Ansible playbook to collect Linux server metrics.
     Runs every 5 minutes via Celery Beat.
@@ -23,12 +26,21 @@ def collect_linux_metrics(self):
         
         logger.info(f"Starting Linux metrics collection via Ansible")
         
-        runner = ansible_runner.run(
-            playbook=str(playbook_path),
-            inventory=str(inventory_path),
-            quiet=False,
-            verbosity=1,
-        )
+        with singleton('collect_linux_metrics', 'linux') as acquired:
+            if not acquired:
+                return skipped_result('collect_linux_metrics', 'linux')
+            
+            artifact_id = new_artifact_id()
+            started = time.monotonic()
+            runner = ansible_runner.run(
+                **runner_options(artifact_id),
+                playbook=str(playbook_path),
+                inventory=str(inventory_path),
+                quiet=False,
+                verbosity=1,
+            )
+        
+        summary = summarize_run(runner, artifact_id, time.monotonic() - started)
         
         if runner.status == 'successful':
             logger.info(f"Linux metrics collected successfully. Stats: {runner.stats}")
@@ -41,27 +53,23 @@ def collect_linux_metrics(self):
                 source='ansible_integration'
             )
             
-            return {
-                'status': 'success',
-                'stats': runner.stats,
-                'hosts_ok': len(runner.stats.get('ok', {}))
-            }
+            return {'status': 'success', **summary}
         else:
             logger.error(f"Linux metrics collection failed: {runner.status}")
-            return {'status': 'failed', 'error': runner.status}
+            return {'status': 'failed', **summary}
     
     except FileNotFoundError:
         logger.error(f"Playbook not found: {playbook_path}")
         return {'status': 'error', 'message': 'Playbook not found'}
     
     except Exception as e:
+        # No retry: the next beat cycle runs it again, under the same lock
         logger.exception("Error collecting Linux metrics")
-        # Retry task
-        raise self.retry(exc=e, countdown=60)
+        return {'status': 'error', 'message': str(e)}
 
 
-@shared_task(bind=True, max_retries=3)
-def collect_windows_metrics(self):
+@shared_task
+def collect_windows_metrics():
     """
     Execute Ansible playbook to collect Windows server metrics.
     Runs every 5 minutes via Celery Beat.
@@ -72,12 +80,21 @@ def collect_windows_metrics(self):
         
         logger.info(f"Starting Windows metrics collection via Ansible")
         
-        runner = ansible_runner.run(
-            playbook=str(playbook_path),
-            inventory=str(inventory_path),
-            quiet=False,
-            verbosity=1,
-        )
+        with singleton('collect_windows_metrics', 'windows') as acquired:
+            if not acquired:
+                return skipped_result('collect_windows_metrics', 'windows')
+            
+            artifact_id = new_artifact_id()
+            started = time.monotonic()
+            runner = ansible_runner.run(
+                **runner_options(artifact_id),
+                playbook=str(playbook_path),
+                inventory=str(inventory_path),
+                quiet=False,
+                verbosity=1,
+            )
+        
+        summary = summarize_run(runner, artifact_id, time.monotonic() - started)
         
         if runner.status == 'successful':
             logger.info(f"Windows metrics collected successfully. Stats: {runner.stats}")
@@ -89,22 +106,18 @@ def collect_windows_metrics(self):
                 source='ansible_integration'
             )
             
-            return {
-                'status': 'success',
-                'stats': runner.stats,
-                'hosts_ok': len(runner.stats.get('ok', {}))
-            }
+            return {'status': 'success', **summary}
         else:
             logger.error(f"Windows metrics collection failed: {runner.status}")
-            return {'status': 'failed', 'error': runner.status}
+            return {'status': 'failed', **summary}
     
     except Exception as e:
         logger.exception("Error collecting Windows metrics")
-        raise self.retry(exc=e, countdown=60)
+        return {'status': 'error', 'message': str(e)}
 
 
-@shared_task(bind=True, max_retries=3)
-def collect_database_metrics(self):
+@shared_task
+def collect_database_metrics():
     """
     Execute Ansible playbook to collect database metrics.
     Runs every 5 minutes via Celery Beat.
@@ -115,12 +128,21 @@ def collect_database_metrics(self):
         
         logger.info(f"Starting database metrics collection via Ansible")
         
-        runner = ansible_runner.run(
-            playbook=str(playbook_path),
-            inventory=str(inventory_path),
-            quiet=False,
-            verbosity=1,
-        )
+        with singleton('collect_database_metrics', 'database') as acquired:
+            if not acquired:
+                return skipped_result('collect_database_metrics', 'database')
+            
+            artifact_id = new_artifact_id()
+            started = time.monotonic()
+            runner = ansible_runner.run(
+                **runner_options(artifact_id),
+                playbook=str(playbook_path),
+                inventory=str(inventory_path),
+                quiet=False,
+                verbosity=1,
+            )
+        
+        summary = summarize_run(runner, artifact_id, time.monotonic() - started)
         
         if runner.status == 'successful':
             logger.info(f"Database metrics collected successfully. Stats: {runner.stats}")
@@ -132,18 +154,14 @@ def collect_database_metrics(self):
                 source='ansible_integration'
             )
             
-            return {
-                'status': 'success',
-                'stats': runner.stats,
-                'hosts_ok': len(runner.stats.get('ok', {}))
-            }
+            return {'status': 'success', **summary}
         else:
             logger.error(f"Database metrics collection failed: {runner.status}")
-            return {'status': 'failed', 'error': runner.status}
+            return {'status': 'failed', **summary}
     
     except Exception as e:
         logger.exception("Error collecting database metrics")
-        raise self.retry(exc=e, countdown=60)
+        return {'status': 'error', 'message': str(e)}
 
 
 @shared_task
@@ -161,7 +179,10 @@ def execute_ansible_playbook(playbook_name, extra_vars=None):
         
         logger.info(f"Executing Ansible playbook: {playbook_name}")
         
+        artifact_id = new_artifact_id()
+        started = time.monotonic()
         runner = ansible_runner.run(
+            **runner_options(artifact_id),
             playbook=str(playbook_path),
             inventory=str(inventory_path),
             extravars=extra_vars or {},
@@ -170,8 +191,7 @@ def execute_ansible_playbook(playbook_name, extra_vars=None):
         
         return {
             'status': runner.status,
-            'stats': runner.stats,
-            'rc': runner.rc
+            **summarize_run(runner, artifact_id, time.monotonic() - started)
         }
     
     except Exception as e:
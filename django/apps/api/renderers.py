@@ -0,0 +1,37 @@
+"""
+API renderers.
+"""
+from decimal import Decimal
+
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+
+def _default(obj):
+    """Types orjson doesn't handle natively, rendered like DRF's JSONRenderer."""
+    if isinstance(obj, Decimal):
+        # Same as DRF's COERCE_DECIMAL_TO_STRING default
+        return str(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON renderer backed by orjson.
+    
+    Serializers hand over datetimes already formatted (current time zone);
+    OPT_UTC_Z only applies to raw aware datetimes left in the data.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=_default, option=self.options)
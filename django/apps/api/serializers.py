@@ -1,10 +1,18 @@
 """
 Serializers for API.
 """
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
+from apps.core.cache import METRICS, bump_version
 from apps.core.models import System, Metric, Log
 
 
+CENT = Decimal('0.01')
+
+
 class SystemSerializer(serializers.ModelSerializer):
     """Serializer for System model."""
     
@@ -41,14 +49,97 @@ class MetricSerializer(serializers.ModelSerializer):
         read_only_fields = ['timestamp']
 
 
-class MetricBulkSerializer(serializers.Serializer):
-    """Serializer for bulk metric creation."""
-    metrics = MetricSerializer(many=True)
+class MetricBulkIngest:
+    """
+    Validation and insert for POST /metrics/bulk/ without a serializer per row.
+    
+    The system ids of the whole payload are checked with one IN query and
+    the numeric fields in a plain loop (rounded to the 2 decimals of the
+    model fields); rows are written with bulk_create in batches of
+    METRIC_BULK_BATCH_SIZE. Errors are reported per row index.
+    """
+    # field: (minimum, maximum, required)
+    numeric_fields = {
+        'cpu_usage': (Decimal('0'), Decimal('100'), True),
+        'memory_usage': (Decimal('0'), Decimal('100'), True),
+        'disk_usage': (Decimal('0'), Decimal('100'), True),
+        'network_in': (Decimal('0'), Decimal('99999999.99'), False),
+        'network_out': (Decimal('0'), Decimal('99999999.99'), False),
+    }
+    max_reported_errors = 100
+    
+    @staticmethod
+    def parse_system_id(value):
+        """Integer id, or None: only ints (not bools) and digit strings are ids."""
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.isascii() and value.isdigit():
+            return int(value)
+        return None
     
-    def create(self, validated_data):
-        metrics_data = validated_data.pop('metrics')
-        metrics = [Metric(**data) for data in metrics_data]
-        return Metric.objects.bulk_create(metrics)
+    def validate(self, rows):
+        """Metric instances for the rows, or ValidationError for the payload."""
+        if not isinstance(rows, list):
+            raise serializers.ValidationError({'metrics': ['Expected a list of metrics.']})
+        if len(rows) > settings.METRIC_BULK_MAX_ROWS:
+            raise serializers.ValidationError({
+                'metrics': [f'At most {settings.METRIC_BULK_MAX_ROWS} metrics per request.']
+            })
+        
+        errors = {}
+        parsed = []
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors[index] = {'non_field_errors': ['Expected an object.']}
+                continue
+            
+            row_errors = {}
+            values = {}
+            system_id = self.parse_system_id(row.get('system'))
+            if system_id is None:
+                row_errors['system'] = ['A valid system id is required.']
+            else:
+                values['system_id'] = system_id
+            
+            for name, (minimum, maximum, required) in self.numeric_fields.items():
+                value = row.get(name)
+                if value is None:
+                    if required:
+                        row_errors[name] = ['This field is required.']
+                    continue
+                try:
+                    number = Decimal(str(value))
+                    valid = number.is_finite() and minimum <= number <= maximum
+                except InvalidOperation:
+                    valid = False
+                if not valid:
+                    row_errors[name] = [f'A number between {minimum} and {maximum} is required.']
+                    continue
+                values[name] = number.quantize(CENT, rounding=ROUND_HALF_UP)
+            
+            if row_errors:
+                errors[index] = row_errors
+            else:
+                parsed.append((index, values))
+        
+        system_ids = {values['system_id'] for _, values in parsed}
+        known = set(System.objects.filter(id__in=system_ids).values_list('id', flat=True))
+        for index, values in parsed:
+            if values['system_id'] not in known:
+                errors[index] = {'system': [f'Invalid pk "{values["system_id"]}" - object does not exist.']}
+        
+        if errors:
+            reported = dict(sorted(errors.items())[:self.max_reported_errors])
+            raise serializers.ValidationError({'metrics': reported, 'invalid_rows': len(errors)})
+        
+        return [Metric(**values) for _, values in parsed]
+    
+    def save(self, rows):
+        """Validate and insert the rows; returns how many were created."""
+        metrics = self.validate(rows)
+        Metric.objects.bulk_create(metrics, batch_size=settings.METRIC_BULK_BATCH_SIZE)
+        bump_version(METRICS)
+        return len(metrics)
 
 
 class LogSerializer(serializers.ModelSerializer):
@@ -75,3 +166,85 @@ class DashboardStatsSerializer(serializers.Serializer):
     avg_cpu_usage = serializers.DecimalField(max_digits=5, decimal_places=2)
     avg_memory_usage = serializers.DecimalField(max_digits=5, decimal_places=2)
     avg_disk_usage = serializers.DecimalField(max_digits=5, decimal_places=2)
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for large lists.
+    
+    Rows come from a values_list() projection and are zipped with the
+    precompiled output names, so no model instances or serializer fields are
+    built per row. Subclasses map each output name to an ORM lookup; the
+    output matches the equivalent ModelSerializer.
+    """
+    fields = {}
+    # Output names rendered like DRF's DateTimeField
+    datetime_fields = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.names = tuple(cls.fields)
+        cls.lookups = tuple(cls.fields.values())
+        cls.datetime_indexes = tuple(cls.names.index(name) for name in cls.datetime_fields)
+    
+    @classmethod
+    def project(cls, queryset):
+        """Restrict a queryset to the serialized columns."""
+        return queryset.values_list(*cls.lookups)
+    
+    @staticmethod
+    def format_datetime(value):
+        """ISO 8601 in the current time zone, 'Z' for UTC (DateTimeField output)."""
+        if value is None:
+            return None
+        value = timezone.localtime(value).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    
+    @classmethod
+    def to_data(cls, rows):
+        names = cls.names
+        indexes = cls.datetime_indexes
+        if not indexes:
+            return [dict(zip(names, row)) for row in rows]
+        
+        data = []
+        format_datetime = cls.format_datetime
+        for row in rows:
+            row = list(row)
+            for index in indexes:
+                row[index] = format_datetime(row[index])
+            data.append(dict(zip(names, row)))
+        return data
+
+
+class MetricListSerializer(ValuesSerializer):
+    """Fast read-only equivalent of MetricSerializer."""
+    fields = {
+        'id': 'id',
+        'system': 'system_id',
+        'system_name': 'system__name',
+        'system_type': 'system__type',
+        'cpu_usage': 'cpu_usage',
+        'memory_usage': 'memory_usage',
+        'disk_usage': 'disk_usage',
+        'network_in': 'network_in',
+        'network_out': 'network_out',
+        'timestamp': 'timestamp',
+    }
+    datetime_fields = ('timestamp',)
+
+
+class LogListSerializer(ValuesSerializer):
+    """Fast read-only equivalent of LogSerializer."""
+    fields = {
+        'id': 'id',
+        'system': 'system_id',
+        'system_name': 'system__name',
+        'level': 'level',
+        'message': 'message',
+        'source': 'source',
+        'timestamp': 'timestamp',
+    }
+    datetime_fields = ('timestamp',)
@@ -1,21 +1,45 @@
 """
 API Views using Django REST Framework.
 """
+from asgiref.sync import async_to_sync
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Avg, Count, Q
+from django.conf import settings
+from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
 
+from apps.core.cache import ALL_GROUPS, METRICS, SYSTEMS, cached_view
+from apps.core.dashboard import dashboard_data
+from apps.core.db_stats import get_db_stats
 from apps.core.models import System, Metric, Log
+from apps.ansible_integration.locks import get_lock_stats
 from .serializers import (
     SystemSerializer, SystemListSerializer,
-    MetricSerializer, MetricBulkSerializer,
-    LogSerializer, DashboardStatsSerializer
+    MetricSerializer, MetricBulkIngest, MetricListSerializer,
+    LogSerializer, LogListSerializer, DashboardStatsSerializer
 )
 
 
+class FastListMixin:
+    """
+    list() through a ValuesSerializer (values_list projection) instead of
+    building a model instance and a ModelSerializer per row.
+    """
+    list_serializer_class = None
+    
+    def list(self, request, *args, **kwargs):
+        serializer = self.list_serializer_class
+        queryset = serializer.project(self.filter_queryset(self.get_queryset()))
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_data(page))
+        
+        return Response(serializer.to_data(queryset))
+
+
 class SystemViewSet(viewsets.ModelViewSet):
     """
     ViewSet for System CRUD operations.
@@ -36,25 +60,19 @@ class SystemViewSet(viewsets.ModelViewSet):
         return SystemSerializer
     
     @action(detail=False, methods=['get'])
+    @cached_view('system_stats', (SYSTEMS,))
     def stats(self, request):
-        """Get system statistics."""
-        stats = {
-            'total': System.objects.count(),
-            'online': System.objects.filter(status='online').count(),
-            'warning': System.objects.filter(status='warning').count(),
-            'offline': System.objects.filter(status='offline').count(),
-            'by_type': {}
-        }
-        
-        # Count by type
-        type_counts = System.objects.values('type').annotate(count=Count('id'))
-        for item in type_counts:
-            stats['by_type'][item['type']] = item['count']
-        
-        return Response(stats)
+        """Get system statistics (one aggregate query)."""
+        stats = System.objects.stats()
+        return Response({
+            'total': stats['total'],
+            **stats['by_status'],
+            'by_type': stats['by_type'],
+            'by_type_status': stats['by_type_status'],
+        })
 
 
-class MetricViewSet(viewsets.ModelViewSet):
+class MetricViewSet(FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet for Metric operations.
     
@@ -66,6 +84,7 @@ class MetricViewSet(viewsets.ModelViewSet):
     """
     queryset = Metric.objects.select_related('system').all()
     serializer_class = MetricSerializer
+    list_serializer_class = MetricListSerializer
     filterset_fields = ['system', 'system__type']
     ordering_fields = ['timestamp']
     
@@ -89,31 +108,29 @@ class MetricViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'])
     def bulk(self, request):
-        """Create multiple metrics at once."""
-        serializer = MetricBulkSerializer(data={'metrics': request.data})
-        serializer.is_valid(raise_exception=True)
-        metrics = serializer.save()
-        return Response(
-            MetricSerializer(metrics, many=True).data,
-            status=status.HTTP_201_CREATED
-        )
+        """
+        Create multiple metrics at once.
+        
+        One query validates every system id and inserts go in batches, so
+        a request can carry tens of thousands of rows; the response only
+        reports how many were created.
+        """
+        created = MetricBulkIngest().save(request.data)
+        return Response({'created': created}, status=status.HTTP_201_CREATED)
     
     @action(detail=False, methods=['get'])
+    @cached_view('latest_metrics', (SYSTEMS, METRICS), timeout=settings.LATEST_METRICS_CACHE_TTL)
     def latest(self, request):
-        """Get latest metric for each system."""
-        latest_metrics = []
-        systems = System.objects.all()
-        
-        for system in systems:
-            metric = Metric.objects.filter(system=system).order_by('-timestamp').first()
-            if metric:
-                latest_metrics.append(metric)
+        """
+        Get latest metric for each system.
         
-        serializer = MetricSerializer(latest_metrics, many=True)
-        return Response(serializer.data)
+        One DISTINCT ON query, cached until the next metric is ingested.
+        """
+        latest_metrics = Metric.objects.latest_per_system()
+        return Response(MetricListSerializer.to_data(MetricListSerializer.project(latest_metrics)))
 
 
-class LogViewSet(viewsets.ModelViewSet):
+class LogViewSet(FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet for Log operations.
     
@@ -124,6 +141,7 @@ class LogViewSet(viewsets.ModelViewSet):
     """
     queryset = Log.objects.select_related('system').all()
     serializer_class = LogSerializer
+    list_serializer_class = LogListSerializer
     filterset_fields = ['system', 'level', 'system__type']
     search_fields = ['message', 'source']
     ordering_fields = ['timestamp', 'level']
@@ -156,8 +174,7 @@ class LogViewSet(viewsets.ModelViewSet):
         """Get recent logs (last hour)."""
         one_hour_ago = timezone.now() - timedelta(hours=1)
         logs = Log.objects.filter(timestamp__gte=one_hour_ago).order_by('-timestamp')[:50]
-        serializer = LogSerializer(logs, many=True)
-        return Response(serializer.data)
+        return Response(LogListSerializer.to_data(LogListSerializer.project(logs)))
 
 
 class DashboardViewSet(viewsets.ViewSet):
@@ -165,44 +182,37 @@ class DashboardViewSet(viewsets.ViewSet):
     ViewSet for dashboard data.
     
     GET /api/v1/dashboard/ - Get dashboard statistics
+    GET /api/v1/dashboard/task_locks/ - Collection runs started/skipped per task
+    GET /api/v1/dashboard/db_connections/ - Database connections per process
     """
     
+    @cached_view('dashboard', ALL_GROUPS)
     def list(self, request):
-        """Get complete dashboard data."""
-        # System statistics
-        total_systems = System.objects.count()
-        online_systems = System.objects.filter(status='online').count()
-        warning_systems = System.objects.filter(status='warning').count()
-        offline_systems = System.objects.filter(status='offline').count()
-        
-        # Systems by type
-        systems_by_type = {}
-        type_counts = System.objects.values('type').annotate(count=Count('id'))
-        for item in type_counts:
-            systems_by_type[item['type']] = item['count']
+        """
+        Get complete dashboard data.
         
-        # Recent logs
-        recent_logs = Log.objects.select_related('system').order_by('-timestamp')[:10]
-        
-        # Average metrics (last hour)
-        one_hour_ago = timezone.now() - timedelta(hours=1)
-        avg_metrics = Metric.objects.filter(timestamp__gte=one_hour_ago).aggregate(
-            avg_cpu=Avg('cpu_usage'),
-            avg_memory=Avg('memory_usage'),
-            avg_disk=Avg('disk_usage')
-        )
+        DRF views are sync, so the concurrent aggregates of
+        apps.core.dashboard run in an event loop of their own.
+        """
+        data = async_to_sync(dashboard_data)()
+        avg_metrics = data.pop('avg_metrics')
         
-        data = {
-            'total_systems': total_systems,
-            'online_systems': online_systems,
-            'warning_systems': warning_systems,
-            'offline_systems': offline_systems,
-            'systems_by_type': systems_by_type,
-            'recent_logs': LogSerializer(recent_logs, many=True).data,
+        data.update({
+            'recent_logs': LogSerializer(data['recent_logs'], many=True).data,
             'avg_cpu_usage': avg_metrics['avg_cpu'] or 0,
             'avg_memory_usage': avg_metrics['avg_memory'] or 0,
             'avg_disk_usage': avg_metrics['avg_disk'] or 0,
-        }
+        })
         
         serializer = DashboardStatsSerializer(data)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def task_locks(self, request):
+        """Started, skipped (overlapping) and lost runs per task and host group."""
+        return Response(get_lock_stats())
+    
+    @action(detail=False, methods=['get'])
+    def db_connections(self, request):
+        """Connections opened per web / worker process and pool waits."""
+        return Response(get_db_stats())
@@ -0,0 +1,177 @@
+"""
+Versioned view cache shared by views and ingest paths.
+
+Cached views store their output under a key that embeds the current version
+of each data group they read (systems, metrics, logs). Writes bump the
+version of their group instead of deleting keys: every view built on that
+group misses on its next request and the old entries just expire.
+"""
+import asyncio
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+VERSION_PREFIX = 'cache_version'
+VIEW_PREFIX = 'view'
+
+SYSTEMS = 'systems'
+METRICS = 'metrics'
+LOGS = 'logs'
+ALL_GROUPS = (SYSTEMS, METRICS, LOGS)
+
+
+def _keys(group):
+    """Version, throttle window and pending-write flag of a group."""
+    key = f'{VERSION_PREFIX}:{group}'
+    return key, f'{key}:throttle', f'{key}:dirty'
+
+
+def _bump(group):
+    """
+    Move the group to a new version unless one was made in the current
+    CACHE_BUMP_INTERVAL window. Returns the new version, or None.
+    """
+    version_key, throttle_key, dirty_key = _keys(group)
+    if not cache.add(throttle_key, 1, timeout=settings.CACHE_BUMP_INTERVAL):
+        return None
+    # Cleared before the new version is set: a write flagged after this
+    # point gets a bump of its own in the next window
+    cache.delete(dirty_key)
+    version = time.time_ns()
+    cache.set(version_key, version, timeout=None)
+    return version
+
+
+async def _abump(group):
+    version_key, throttle_key, dirty_key = _keys(group)
+    if not await cache.aadd(throttle_key, 1, timeout=settings.CACHE_BUMP_INTERVAL):
+        return None
+    await cache.adelete(dirty_key)
+    version = time.time_ns()
+    await cache.aset(version_key, version, timeout=None)
+    return version
+
+
+def _flag_write(groups):
+    for group in groups:
+        if _bump(group) is None:
+            # Throttled: the first read after the window bumps the version
+            cache.set(_keys(group)[2], 1, timeout=None)
+
+
+def bump_version(*groups):
+    """
+    Give the data groups a new version once the current write commits.
+    
+    Throttled to one bump per group every CACHE_BUMP_INTERVAL seconds, so
+    ingest bursts cost no more than one version change per second. Writes
+    inside a window are flagged instead, and the first read after the
+    window bumps the version, so the last write is never lost: cached
+    views lag writes by at most CACHE_BUMP_INTERVAL.
+    """
+    transaction.on_commit(lambda: _flag_write(groups))
+
+
+def _all_keys(groups):
+    return [key for group in groups for key in _keys(group)]
+
+
+def _versions(groups, found, bumped):
+    """Current version per group, 0 if never bumped."""
+    versions = []
+    for group in groups:
+        version_key = _keys(group)[0]
+        versions.append(str(bumped.get(group) or found.get(version_key, 0)))
+    return versions
+
+
+def _pending(groups, found):
+    """Groups with flagged writes whose throttle window has ended."""
+    return [
+        group for group in groups
+        if _keys(group)[2] in found and _keys(group)[1] not in found
+    ]
+
+
+def get_versions(groups):
+    """Current version of each group, in order, bumping flagged groups."""
+    found = cache.get_many(_all_keys(groups))
+    bumped = {group: _bump(group) for group in _pending(groups, found)}
+    return _versions(groups, found, bumped)
+
+
+async def aget_versions(groups):
+    found = await cache.aget_many(_all_keys(groups))
+    bumped = {group: await _abump(group) for group in _pending(groups, found)}
+    return _versions(groups, found, bumped)
+
+
+def _view_key(name, versions, request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"{VIEW_PREFIX}:{name}:{'.'.join(versions)}:{path}"
+
+
+def _from_cache(cached):
+    kind, content, content_type = cached
+    if kind == 'data':
+        return Response(content)
+    return HttpResponse(content, content_type=content_type)
+
+
+def _to_cache(response):
+    if isinstance(response, Response):
+        return ('data', response.data, None)
+    return ('content', response.content, response['Content-Type'])
+
+
+def cached_view(name, groups, timeout=None):
+    """
+    Cache a view per URL (path and query string) and version of its groups.
+    
+    Works on function views (sync or async) and on ViewSet methods; the
+    request is the last positional argument in all of them. DRF responses
+    are cached as their data and other responses (rendered templates) as
+    bytes. Only successful GETs are stored.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                request = args[-1]
+                if request.method != 'GET':
+                    return await view(*args, **kwargs)
+                
+                key = _view_key(name, await aget_versions(groups), request)
+                cached = await cache.aget(key)
+                if cached is not None:
+                    return _from_cache(cached)
+                
+                response = await view(*args, **kwargs)
+                if response.status_code == 200:
+                    await cache.aset(key, _to_cache(response), timeout or settings.VIEW_CACHE_TTL)
+                return response
+            return async_wrapper
+        
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[-1]
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            
+            key = _view_key(name, get_versions(groups), request)
+            cached = cache.get(key)
+            if cached is not None:
+                return _from_cache(cached)
+            
+            response = view(*args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, _to_cache(response), timeout or settings.VIEW_CACHE_TTL)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+"""
+Dashboard aggregates, run concurrently.
+
+The dashboard reads several independent aggregates. Each one runs in its own
+worker thread, and so on its own database connection, so building the page
+takes about as long as the slowest query instead of the sum of all of them.
+
+The threads come from one bounded executor per process, not from the event
+loop's default executor: under WSGI every request runs on a new loop, whose
+executor (and its threads and connections) would be thrown away each time.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Avg
+from django.utils import timezone
+
+from apps.core.models import System, Metric, Log
+
+
+# Caps the connections the dashboard uses per process
+QUERY_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.DASHBOARD_QUERY_WORKERS, thread_name_prefix='dashboard-query'
+)
+
+
+def _own_connection(query):
+    """
+    Wrap a query for an executor thread. With DB_POOL the connection goes
+    back to the pool after each query; otherwise the long-lived thread keeps
+    it for the next request, up to CONN_MAX_AGE, like a request thread.
+    """
+    def run():
+        close_old_connections()
+        try:
+            return query()
+        finally:
+            if settings.DB_POOL:
+                connection.close()
+            else:
+                close_old_connections()
+    return run
+
+
+async def gather_queries(**queries):
+    """Run sync ORM callables concurrently and return their results by name."""
+    results = await asyncio.gather(*(
+        sync_to_async(_own_connection(query), thread_sensitive=False, executor=QUERY_EXECUTOR)()
+        for query in queries.values()
+    ))
+    return dict(zip(queries, results))
+
+
+def _recent_logs():
+    return list(Log.objects.select_related('system').order_by('-timestamp')[:10])
+
+
+def _average_metrics():
+    one_hour_ago = timezone.now() - timedelta(hours=1)
+    return Metric.objects.filter(timestamp__gte=one_hour_ago).aggregate(
+        avg_cpu=Avg('cpu_usage'),
+        avg_memory=Avg('memory_usage'),
+        avg_disk=Avg('disk_usage')
+    )
+
+
+def _systems_with_metrics():
+    return list(System.objects.with_latest_metrics())
+
+
+async def dashboard_data(with_systems=False):
+    """
+    System counts (one query), recent logs and last-hour averages;
+    with_systems adds every system with its latest metric (HTML dashboard).
+    """
+    queries = {
+        'system_stats': System.objects.stats,
+        'recent_logs': _recent_logs,
+        'avg_metrics': _average_metrics,
+    }
+    if with_systems:
+        queries['systems_with_metrics'] = _systems_with_metrics
+    
+    data = await gather_queries(**queries)
+    stats = data.pop('system_stats')
+    data.update({
+        'total_systems': stats['total'],
+        'online_systems': stats['by_status']['online'],
+        'warning_systems': stats['by_status']['warning'],
+        'offline_systems': stats['by_status']['offline'],
+        'systems_by_type': stats['by_type'],
+    })
+    return data
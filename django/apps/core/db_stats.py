@@ -0,0 +1,101 @@
+"""
+Database connection instrumentation.
+
+Each web and worker process counts the connections it opens against the
+requests and tasks it served. With DB_POOL it also reports the psycopg pool
+counters (clients waiting, total wait time, errors). The numbers go to Redis
+as db_stats:<host>:<pid> at most every DB_STATS_INTERVAL seconds and expire
+once the process is gone.
+"""
+import logging
+import os
+import socket
+import time
+
+import redis
+from celery.signals import task_postrun
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from apps.ansible_integration.locks import get_client
+
+logger = logging.getLogger(__name__)
+
+STATS_PREFIX = 'db_stats'
+
+_counters = {'connects': 0, 'requests': 0, 'tasks': 0}
+_state = {'pid': os.getpid(), 'published_at': 0.0}
+
+
+def _process_counters():
+    """Counters of this process (reset in forked children)."""
+    if _state['pid'] != os.getpid():
+        _state.update(pid=os.getpid(), published_at=0.0)
+        _counters.update(connects=0, requests=0, tasks=0)
+    return _counters
+
+
+@receiver(connection_created)
+def count_connection(sender, **kwargs):
+    _process_counters()['connects'] += 1
+
+
+def pool_stats(alias='default'):
+    """psycopg pool counters; empty when DB_POOL is off."""
+    if not settings.DB_POOL:
+        return {}
+    return connections[alias].pool.get_stats()
+
+
+def process_stats():
+    stats = {'pid': os.getpid(), **_process_counters()}
+    stats.update({f'pool_{name}': value for name, value in pool_stats().items()})
+    return stats
+
+
+def publish(force=False):
+    """Store this process's counters in Redis, throttled to DB_STATS_INTERVAL."""
+    now = time.monotonic()
+    _process_counters()
+    if not force and now - _state['published_at'] < settings.DB_STATS_INTERVAL:
+        return
+    _state['published_at'] = now
+    
+    key = f'{STATS_PREFIX}:{socket.gethostname()}:{os.getpid()}'
+    try:
+        with get_client().pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=process_stats())
+            pipe.expire(key, settings.DB_STATS_TTL)
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish database stats: {e!r}")
+
+
+@receiver(request_finished)
+def request_done(sender, **kwargs):
+    _process_counters()['requests'] += 1
+    publish()
+
+
+@task_postrun.connect
+def task_done(**kwargs):
+    _process_counters()['tasks'] += 1
+    publish()
+
+
+def get_db_stats():
+    """
+    Counters of every live process. A connects count close to the requests
+    or tasks count means connections are not being reused.
+    """
+    client = get_client()
+    return {
+        key[len(STATS_PREFIX) + 1:]: {
+            name: float(value) if '.' in value else int(value)
+            for name, value in client.hgetall(key).items()
+        }
+        for key in client.scan_iter(match=f'{STATS_PREFIX}:*')
+    }
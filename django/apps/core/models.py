@@ -1,11 +1,63 @@
 """
 Core models for infrastructure monitoring.
 """
-from django.db import models
+from django.db import connections, models
+from django.db.models import Count, F, OuterRef, Q, Subquery, Window
+from django.db.models.functions import RowNumber
 from django.core.validators import validate_ipv4_address
 from django.utils import timezone
 
 
+class SystemQuerySet(models.QuerySet):
+    """QuerySet helpers for System."""
+    
+    def with_latest_metrics(self):
+        """
+        Annotate each system with its newest metric, in the same query:
+        latest_cpu, latest_memory, latest_disk and latest_metric_at (None
+        when the system has no metrics yet).
+        
+        Each value is a correlated top-1 subquery on the (system, -timestamp)
+        index, so the cost per system is an index probe, not a query.
+        """
+        latest = Metric.objects.filter(system=OuterRef('pk')).order_by('-timestamp')
+        return self.annotate(
+            latest_cpu=Subquery(latest.values('cpu_usage')[:1]),
+            latest_memory=Subquery(latest.values('memory_usage')[:1]),
+            latest_disk=Subquery(latest.values('disk_usage')[:1]),
+            latest_metric_at=Subquery(latest.values('timestamp')[:1]),
+        )
+    
+    def stats(self):
+        """
+        System counts in one query: total, by_status, by_type and
+        by_type_status ({type: {status: count}}).
+        
+        One row per type with COUNT(*) FILTER (WHERE status = ...) for each
+        status; the totals are summed from those few rows.
+        """
+        statuses = [value for value, _ in System.STATUS_CHOICES]
+        rows = self.order_by().values('type').annotate(
+            total=Count('id'),
+            **{status: Count('id', filter=Q(status=status)) for status in statuses}
+        )
+        
+        stats = {
+            'total': 0,
+            'by_status': dict.fromkeys(statuses, 0),
+            'by_type': {},
+            'by_type_status': {},
+        }
+        for row in rows:
+            stats['total'] += row['total']
+            stats['by_type'][row['type']] = row['total']
+            stats['by_type_status'][row['type']] = {status: row[status] for status in statuses}
+            for status in statuses:
+                stats['by_status'][status] += row[status]
+        
+        return stats
+
+
 class System(models.Model):
     """
     Represents a monitored system (Windows, Linux, or Database server).
@@ -22,6 +74,10 @@ class System(models.Model):
         ('warning', 'Warning'),
     ]
     
+    # Seconds since last_seen before a system turns warning / offline
+    WARNING_AFTER = 300  # 5 minutes
+    OFFLINE_AFTER = 600  # 10 minutes
+    
     name = models.CharField(max_length=255, unique=True)
     type = models.CharField(max_length=20, choices=SYSTEM_TYPES)
     ip_address = models.GenericIPAddressField(validators=[validate_ipv4_address])
@@ -39,6 +95,8 @@ class System(models.Model):
         default='ssh'
     )
     
+    objects = SystemQuerySet.as_manager()
+    
     class Meta:
         db_table = 'systems'
         ordering = ['-created_at']
@@ -55,14 +113,33 @@ class System(models.Model):
         now = timezone.now()
         diff = (now - self.last_seen).total_seconds()
         
-        if diff < 300:  # 5 minutes
+        if diff < self.WARNING_AFTER:
             self.status = 'online'
-        elif diff < 600:  # 10 minutes
+        elif diff < self.OFFLINE_AFTER:
             self.status = 'warning'
         else:
             self.status = 'offline'
         
-        self.save()
+        # update_fields keeps auto_now from bumping last_seen
+        self.save(update_fields=['status'])
+
+
+class MetricQuerySet(models.QuerySet):
+    """QuerySet helpers for Metric."""
+    
+    def latest_per_system(self):
+        """Newest metric of each system, in a single query."""
+        if connections[self.db].features.can_distinct_on_fields:
+            # PostgreSQL: DISTINCT ON (system_id) walks the (system, -timestamp) index
+            return self.order_by('system_id', '-timestamp').distinct('system_id')
+        
+        return self.annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F('system_id'),
+                order_by=F('timestamp').desc(),
+            )
+        ).filter(row_number=1).order_by('system_id')
 
 
 class Metric(models.Model):
@@ -81,6 +158,8 @@ class Metric(models.Model):
     network_out = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     timestamp = models.DateTimeField(auto_now_add=True)
     
+    objects = MetricQuerySet.as_manager()
+    
     class Meta:
         db_table = 'metrics'
         ordering = ['-timestamp']
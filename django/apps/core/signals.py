@@ -0,0 +1,38 @@
+"""
+Signal handlers for core models.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import ALL_GROUPS, LOGS, METRICS, SYSTEMS, bump_version
+from .models import System, Metric, Log
+
+
+@receiver(post_save, sender=System)
+def system_saved(sender, **kwargs):
+    bump_version(SYSTEMS)
+
+
+@receiver(post_delete, sender=System)
+def system_deleted(sender, **kwargs):
+    """Deleting a system cascades to its metrics and logs."""
+    bump_version(*ALL_GROUPS)
+
+
+@receiver(post_save, sender=Metric)
+def metric_saved(sender, **kwargs):
+    """
+    Single saves only: bulk_create and queryset updates send no signals, so
+    bulk ingest paths call bump_version() themselves.
+    
+    Metric and Log have no post_delete receivers on purpose: any receiver
+    makes QuerySet.delete() fetch every row and send one signal per row,
+    which would turn the retention batches into SELECT + DELETE of 5000
+    objects. Retention bumps the version once per run instead.
+    """
+    bump_version(METRICS)
+
+
+@receiver(post_save, sender=Log)
+def log_saved(sender, **kwargs):
+    bump_version(LOGS)
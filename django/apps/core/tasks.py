@@ -2,65 +2,189 @@
 Core tasks (cleanup, etc).
 """
 from celery import shared_task
+from django.conf import settings
+from django.db import connection, transaction
 from django.utils import timezone
 from datetime import timedelta
+from apps.core.cache import LOGS, METRICS, SYSTEMS, bump_version
 from apps.core.models import Metric, Log
+from apps.ansible_integration.locks import get_client, singleton, skipped_result
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 
+RETENTION_PROGRESS_PREFIX = 'retention'
+
+
+def _delete_in_batches(model, cutoff, resume):
+    """
+    Delete rows older than cutoff in bounded batches.
+    
+    Each batch deletes the RETENTION_BATCH_SIZE oldest rows (by timestamp)
+    in its own transaction and sleeps RETENTION_BATCH_SLEEP seconds before
+    the next one. After RETENTION_MAX_RUNTIME seconds the run stops; the
+    Redis hash retention:<table> keeps its progress and the caller queues a
+    continuation.
+    
+    Returns (rows deleted in this run, whether nothing is left to delete).
+    """
+    client = get_client()
+    progress_key = f'{RETENTION_PROGRESS_PREFIX}:{model._meta.db_table}'
+    batch_size = settings.RETENTION_BATCH_SIZE
+    
+    if not resume:
+        client.delete(progress_key)
+    client.hset(progress_key, mapping={
+        'status': 'running',
+        'cutoff': cutoff.isoformat(),
+        'updated_at': timezone.now().isoformat(),
+    })
+    
+    started = time.monotonic()
+    deleted = 0
+    while True:
+        oldest = model.objects.filter(timestamp__lt=cutoff).order_by('timestamp').values('pk')[:batch_size]
+        count = model.objects.filter(pk__in=oldest).delete()[0]
+        
+        deleted += count
+        client.hincrby(progress_key, 'deleted', count)
+        client.hincrby(progress_key, 'batches', 1)
+        client.hset(progress_key, 'updated_at', timezone.now().isoformat())
+        
+        if count < batch_size:
+            client.hset(progress_key, 'status', 'done')
+            return deleted, True
+        
+        if time.monotonic() - started >= settings.RETENTION_MAX_RUNTIME:
+            client.hset(progress_key, 'status', 'paused')
+            return deleted, False
+        
+        time.sleep(settings.RETENTION_BATCH_SLEEP)
+
+
 @shared_task
-def cleanup_old_metrics():
+def cleanup_old_metrics(days=30, resume=False):
     """
-    Delete metrics older than 30 days.
-    Runs daily at 2 AM.
+    Delete metrics older than 30 days, in batches.
+    Runs daily at 2 AM; an unfinished run continues in a new task.
     """
     try:
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        deleted_count = Metric.objects.filter(timestamp__lt=thirty_days_ago).delete()[0]
+        cutoff = timezone.now() - timedelta(days=days)
+        
+        with singleton('cleanup_old_metrics', 'metrics') as acquired:
+            if not acquired:
+                return skipped_result('cleanup_old_metrics', 'metrics')
+            
+            deleted_count, finished = _delete_in_batches(Metric, cutoff, resume)
+            bump_version(METRICS)
+            if not finished:
+                cleanup_old_metrics.apply_async(
+                    kwargs={'days': days, 'resume': True},
+                    countdown=settings.RETENTION_RESUME_DELAY
+                )
         
-        logger.info(f"Deleted {deleted_count} old metrics")
+        logger.info(f"Deleted {deleted_count} old metrics (finished: {finished})")
         
-        Log.objects.create(
-            system_id=1,
-            level='info',
-            message=f'Cleanup completed: {deleted_count} old metrics deleted',
-            source='cleanup_task'
-        )
+        if finished:
+            Log.objects.create(
+                system_id=1,
+                level='info',
+                message=f'Cleanup completed: old metrics deleted before {cutoff:%Y-%m-%d}',
+                source='cleanup_task'
+            )
         
-        return {'status': 'success', 'deleted': deleted_count}
+        return {'status': 'success', 'deleted': deleted_count, 'finished': finished}
     
     except Exception as e:
         logger.exception("Error cleaning up old metrics")
         return {'status': 'error', 'message': str(e)}
 
 
+@shared_task
+def cleanup_old_logs(days=90, resume=False):
+    """
+    Delete logs older than 90 days, in batches.
+    Runs daily at 2:30 AM; an unfinished run continues in a new task.
+    """
+    try:
+        cutoff = timezone.now() - timedelta(days=days)
+        
+        with singleton('cleanup_old_logs', 'logs') as acquired:
+            if not acquired:
+                return skipped_result('cleanup_old_logs', 'logs')
+            
+            deleted_count, finished = _delete_in_batches(Log, cutoff, resume)
+            bump_version(LOGS)
+            if not finished:
+                cleanup_old_logs.apply_async(
+                    kwargs={'days': days, 'resume': True},
+                    countdown=settings.RETENTION_RESUME_DELAY
+                )
+        
+        logger.info(f"Deleted {deleted_count} old logs (finished: {finished})")
+        return {'status': 'success', 'deleted': deleted_count, 'finished': finished}
+    
+    except Exception as e:
+        logger.exception("Error cleaning up old logs")
+        return {'status': 'error', 'message': str(e)}
+
+
+STATUS_SWEEP_SQL = """
+    UPDATE systems AS s
+    SET status = t.new_status
+    FROM (
+        SELECT id, status AS old_status,
+               CASE
+                   WHEN last_seen >= %(warning_since)s THEN 'online'
+                   WHEN last_seen >= %(offline_since)s THEN 'warning'
+                   ELSE 'offline'
+               END AS new_status
+        FROM systems
+    ) AS t
+    WHERE s.id = t.id AND t.old_status <> t.new_status
+    RETURNING s.id, t.old_status, t.new_status
+"""
+
+
 @shared_task
 def update_system_statuses():
     """
     Update system statuses based on last_seen timestamp.
     Runs every minute.
+    
+    One UPDATE ... RETURNING changes only the systems whose status moves
+    and one bulk insert logs the transitions, so the sweep is two queries
+    however many systems there are.
     """
     from apps.core.models import System
     
     try:
-        systems = System.objects.all()
-        updated = 0
+        now = timezone.now()
+        params = {
+            'warning_since': now - timedelta(seconds=System.WARNING_AFTER),
+            'offline_since': now - timedelta(seconds=System.OFFLINE_AFTER),
+        }
         
-        for system in systems:
-            old_status = system.status
-            system.update_status()
-            if old_status != system.status:
-                updated += 1
-                
-                Log.objects.create(
-                    system=system,
-                    level='warning' if system.status == 'offline' else 'info',
-                    message=f'System status changed from {old_status} to {system.status}',
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(STATUS_SWEEP_SQL, params)
+                changes = cursor.fetchall()
+            
+            Log.objects.bulk_create([
+                Log(
+                    system_id=system_id,
+                    level='warning' if new_status == 'offline' else 'info',
+                    message=f'System status changed from {old_status} to {new_status}',
                     source='status_monitor'
                 )
+                for system_id, old_status, new_status in changes
+            ], batch_size=1000)
         
+        updated = len(changes)
+        if updated:
+            bump_version(SYSTEMS, LOGS)
         logger.info(f"Updated {updated} system statuses")
         return {'status': 'success', 'updated': updated}
     
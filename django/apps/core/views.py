@@ -1,75 +1,47 @@
 """
 Core views for dashboard.
 """
-from django.shortcuts import render
-from django.db.models import Count, Avg
+from asgiref.sync import sync_to_async
+from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
 from datetime import timedelta
+from apps.core.cache import ALL_GROUPS, LOGS, METRICS, SYSTEMS, cached_view
+from apps.core.dashboard import dashboard_data
 from apps.core.models import System, Metric, Log
 
 
-def dashboard(request):
-    """Main dashboard view."""
-    # Get system statistics
-    total_systems = System.objects.count()
-    online_systems = System.objects.filter(status='online').count()
-    warning_systems = System.objects.filter(status='warning').count()
-    offline_systems = System.objects.filter(status='offline').count()
-    
-    # Systems by type
-    systems_by_type = System.objects.values('type').annotate(count=Count('id'))
-    
-    # Recent logs
-    recent_logs = Log.objects.select_related('system').order_by('-timestamp')[:10]
-    
-    # Average metrics (last hour)
-    one_hour_ago = timezone.now() - timedelta(hours=1)
-    avg_metrics = Metric.objects.filter(timestamp__gte=one_hour_ago).aggregate(
-        avg_cpu=Avg('cpu_usage'),
-        avg_memory=Avg('memory_usage'),
-        avg_disk=Avg('disk_usage')
-    )
-    
-    # All systems with latest metrics
-    systems = System.objects.all()
-    systems_with_metrics = []
-    for system in systems:
-        latest_metric = Metric.objects.filter(system=system).order_by('-timestamp').first()
-        systems_with_metrics.append({
-            'system': system,
-            'metric': latest_metric
-        })
+@cached_view('core_dashboard', ALL_GROUPS)
+async def dashboard(request):
+    """Main dashboard view (independent aggregates run concurrently)."""
+    data = await dashboard_data(with_systems=True)
+    avg_metrics = data.pop('avg_metrics')
     
     context = {
-        'total_systems': total_systems,
-        'online_systems': online_systems,
-        'warning_systems': warning_systems,
-        'offline_systems': offline_systems,
-        'systems_by_type': systems_by_type,
-        'recent_logs': recent_logs,
+        **data,
         'avg_cpu': avg_metrics['avg_cpu'] or 0,
         'avg_memory': avg_metrics['avg_memory'] or 0,
         'avg_disk': avg_metrics['avg_disk'] or 0,
-        'systems_with_metrics': systems_with_metrics,
     }
     
-    return render(request, 'dashboard.html', context)
+    return await sync_to_async(render)(request, 'dashboard.html', context)
 
 
+@cached_view('core_systems_list', (SYSTEMS, METRICS))
 def systems_list(request):
     """List all systems."""
     system_type = request.GET.get('type', None)
     
-    systems = System.objects.all()
+    systems = System.objects.with_latest_metrics()
     if system_type:
         systems = systems.filter(type=system_type)
     
     return render(request, 'systems_list.html', {'systems': systems})
 
 
+@cached_view('core_system_detail', ALL_GROUPS)
 def system_detail(request, system_id):
     """System detail view with metrics and logs."""
-    system = System.objects.get(id=system_id)
+    system = get_object_or_404(System.objects.with_latest_metrics(), id=system_id)
     
     # Get last 24 hours of metrics
     one_day_ago = timezone.now() - timedelta(days=1)
@@ -90,6 +62,7 @@ def system_detail(request, system_id):
     return render(request, 'system_detail.html', context)
 
 
+@cached_view('core_logs', (SYSTEMS, LOGS))
 def logs_view(request):
     """Logs view."""
     level = request.GET.get('level', None)
@@ -4,6 +4,7 @@ Celery configuration.
 import os
 from celery import Celery
 from celery.schedules import crontab
+from kombu import Queue
 
 # Set default Django settings module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -16,6 +17,29 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Auto-discover tasks in all installed apps
 app.autodiscover_tasks()
 
+# Queues: long Ansible runs never share workers with short tasks
+#   collect     -> Ansible playbooks (minutes)
+#   ingest      -> short data tasks (seconds)
+#   maintenance -> status sweep and retention
+app.conf.update(
+    task_queues=(
+        Queue('collect'),
+        Queue('ingest'),
+        Queue('maintenance'),
+    ),
+    task_default_queue='ingest',
+    task_routes={
+        'apps.ansible_integration.tasks.*': {'queue': 'collect'},
+        'apps.core.tasks.*': {'queue': 'maintenance'},
+    },
+    # Reserve one task at a time and ack after it finishes, so a worker busy
+    # with a playbook doesn't hold other tasks prefetched behind it
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    # Must exceed the longest task or late-acked tasks are redelivered
+    broker_transport_options={'visibility_timeout': 60 * 60},
+)
+
 # Celery Beat Schedule
 app.conf.beat_schedule = {
     'collect-linux-metrics': {
@@ -26,14 +50,16 @@ app.conf.beat_schedule = {
         'task': 'apps.ansible_integration.tasks.collect_windows_metrics',
         'schedule': crontab(minute='*/5'),  # Every 5 minutes
     },
-    'collect-database-metrics': {
-        'task': 'apps.ansible_integration.tasks.collect_database_metrics',
-        'schedule': crontab(minute='*/5'),  # Every 5 minutes
-    },
+    # Database metrics are collected by the db-collector service
+    # (python manage.py run_db_collector), which keeps pooled connections
     'cleanup-old-metrics': {
         'task': 'apps.core.tasks.cleanup_old_metrics',
         'schedule': crontab(hour='2', minute='0'),  # Daily at 2 AM
     },
+    'cleanup-old-logs': {
+        'task': 'apps.core.tasks.cleanup_old_logs',
+        'schedule': crontab(hour='2', minute='30'),  # Daily at 2:30 AM
+    },
 }
 
 @app.task(bind=True)
@@ -2,6 +2,7 @@
 Django settings for monitoreo_infra project.
 """
 
+import json
 import os
 from pathlib import Path
 from decouple import config
@@ -69,6 +70,12 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
+# Persistent connections (CONN_MAX_AGE) by default. DB_POOL switches to the
+# psycopg 3 pool instead; Django doesn't combine both.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+# PgBouncer in transaction mode: no server-side cursors or prepared statements
+DB_PGBOUNCER = config('DB_PGBOUNCER', default=False, cast=bool)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -77,9 +84,32 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='db'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+        'OPTIONS': {},
     }
 }
 
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),  # max wait for a connection
+    }
+
+if DB_PGBOUNCER:
+    # psycopg prepares repeated queries server-side; PgBouncer may run the
+    # next execution on another server connection
+    DATABASES['default']['OPTIONS']['prepare_threshold'] = None
+
+# Threads (and so connections) per process for the concurrent dashboard queries
+DASHBOARD_QUERY_WORKERS = config('DASHBOARD_QUERY_WORKERS', default=4, cast=int)
+
+# Connection counters per process, published to Redis (apps.core.db_stats)
+DB_STATS_INTERVAL = config('DB_STATS_INTERVAL', default=10, cast=int)
+DB_STATS_TTL = config('DB_STATS_TTL', default=300, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -116,9 +146,8 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
+        'apps.api.renderers.ORJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
         'rest_framework.throttling.UserRateThrottle'
@@ -144,11 +173,52 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+# Task results hold compact summaries only (see apps.ansible_integration.results)
+CELERY_RESULT_EXPIRES = config('CELERY_RESULT_EXPIRES', default=24 * 60 * 60, cast=int)
+
+# Celery task locks (one collection run per task and host group)
+TASK_LOCK_REDIS_URL = config('REDIS_URL', default=CELERY_BROKER_URL)
+TASK_LOCK_TTL = config('TASK_LOCK_TTL', default=120, cast=int)  # renewed every TTL/3
+
+# Cache (Redis). Views are cached per data version, see apps.core.cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('CACHE_REDIS_URL', default='redis://redis:6379/1'),
+        'KEY_PREFIX': 'monitoreo',
+    }
+}
+# Upper bound for cached views; writes normally move them to a new version first
+VIEW_CACHE_TTL = config('VIEW_CACHE_TTL', default=60, cast=int)
+LATEST_METRICS_CACHE_TTL = config('LATEST_METRICS_CACHE_TTL', default=300, cast=int)
+# Version bumps per data group are throttled to one per interval (seconds)
+CACHE_BUMP_INTERVAL = config('CACHE_BUMP_INTERVAL', default=1, cast=int)
+
+# POST /api/v1/metrics/bulk/ (apps.api.serializers.MetricBulkIngest)
+METRIC_BULK_MAX_ROWS = config('METRIC_BULK_MAX_ROWS', default=50000, cast=int)
+METRIC_BULK_BATCH_SIZE = config('METRIC_BULK_BATCH_SIZE', default=1000, cast=int)
+
+# Retention (batched deletes in apps.core.tasks)
+RETENTION_BATCH_SIZE = config('RETENTION_BATCH_SIZE', default=5000, cast=int)
+RETENTION_BATCH_SLEEP = config('RETENTION_BATCH_SLEEP', default=0.5, cast=float)
+RETENTION_MAX_RUNTIME = config('RETENTION_MAX_RUNTIME', default=20 * 60, cast=int)
+RETENTION_RESUME_DELAY = config('RETENTION_RESUME_DELAY', default=60, cast=int)
 
 # Ansible Configuration
 ANSIBLE_PLAYBOOKS_DIR = BASE_DIR / 'apps' / 'ansible_integration' / 'playbooks'
 ANSIBLE_INVENTORY_DIR = BASE_DIR / 'ansible' / 'inventory'
 ANSIBLE_VAULT_PASSWORD_FILE = BASE_DIR / 'ansible' / '.vault_pass'
+# private_data_dir of ansible-runner; full output of each run in artifacts/<id>
+ANSIBLE_RUNNER_DIR = config('ANSIBLE_RUNNER_DIR', default='/tmp/ansible')
+ANSIBLE_ARTIFACTS_KEEP = config('ANSIBLE_ARTIFACTS_KEEP', default=200, cast=int)
+TASK_RESULT_MAX_HOSTS = config('TASK_RESULT_MAX_HOSTS', default=100, cast=int)
+
+# Database metrics collector (apps.ansible_integration.db_collector)
+DB_COLLECTOR_INTERVAL = config('DB_COLLECTOR_INTERVAL', default=300, cast=int)
+DB_COLLECTOR_TIMEOUT = config('DB_COLLECTOR_TIMEOUT', default=10, cast=int)
+DB_COLLECTOR_POOL_SIZE = config('DB_COLLECTOR_POOL_SIZE', default=2, cast=int)
+DB_COLLECTOR_SIZE_INTERVAL = config('DB_COLLECTOR_SIZE_INTERVAL', default=900, cast=int)
+DB_COLLECTOR_PASSWORDS = config('DB_COLLECTOR_PASSWORDS', default='{}', cast=json.loads)
 
 # Logging
 LOGGING = {
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Inventario dinámico de Ansible generado desde la tabla systems
+
+Uso:
+    ansible-playbook -i ansible/inventory/db_inventory.py playbooks/linux_metrics.yml
+    INVENTORY_TYPE=linux INVENTORY_SLOT=0/4 ansible-playbook -i ansible/inventory/db_inventory.py ...
+
+Ansible solo pasa --list / --host, por eso los filtros estilo --limit se leen
+de variables de entorno (INVENTORY_TYPE, INVENTORY_STATUS, INVENTORY_SLOT).
+Las contraseñas no están en la base de datos: usar group_vars/vault o llaves SSH.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.dynamic_inventory import build_inventory, build_query  # noqa: E402
+
+
+def _cache_file(filters: dict) -> Path:
+    key = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"ansible_db_inventory_{key}.json"
+
+
+def load_inventory(filters: dict) -> dict:
+    """Inventario desde la base de datos, cacheado en disco durante INVENTORY_CACHE_TTL"""
+    cache_file = _cache_file(filters)
+    try:
+        if time.time() - cache_file.stat().st_mtime < settings.INVENTORY_CACHE_TTL:
+            with open(cache_file) as f:
+                return json.load(f)
+    except (FileNotFoundError, ValueError):
+        pass
+
+    engine = create_engine(settings.DATABASE_URL.replace("+asyncpg", "+psycopg2"))
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(build_query(**filters)).all()
+    finally:
+        engine.dispose()
+
+    inventory = build_inventory(rows)
+
+    # Escritura atómica para que ejecuciones paralelas no lean un archivo a medias
+    fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(inventory, f)
+    os.replace(tmp_path, cache_file)
+
+    return inventory
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inventario dinámico desde la base de datos")
+    parser.add_argument("--list", action="store_true", help="Listar todo el inventario")
+    parser.add_argument("--host", help="Variables de un host")
+    parser.add_argument("--type", default=os.environ.get("INVENTORY_TYPE"))
+    parser.add_argument("--status", default=os.environ.get("INVENTORY_STATUS"))
+    parser.add_argument("--slot", default=os.environ.get("INVENTORY_SLOT"))
+    args = parser.parse_args()
+
+    filters = {"system_type": args.type, "status": args.status, "slot": args.slot}
+    inventory = load_inventory(filters)
+
+    if args.host:
+        print(json.dumps(inventory["_meta"]["hostvars"].get(args.host, {})))
+    else:
+        print(json.dumps(inventory))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+# Windows metrics collector
+# Samples every counter in a single Get-Counter call and prints one JSON
+# document, parsed server-side by POST /api/v1/metrics/windows
+
+$ErrorActionPreference = 'Stop'
+
+$counterPaths = @(
+    '\Processor(_Total)\% Processor Time',
+    '\Memory\Available KBytes',
+    '\LogicalDisk(C:)\% Free Space'
+)
+
+$samples = (Get-Counter -Counter $counterPaths -SampleInterval 1 -MaxSamples 1).CounterSamples
+
+$computer = Get-CimInstance Win32_ComputerSystem
+$adapters = Get-NetAdapterStatistics | Where-Object { $_.Name -notlike '*Loopback*' -and $_.Name -notlike '*Bluetooth*' }
+
+[ordered]@{
+    counters        = @($samples | ForEach-Object { [ordered]@{ path = $_.Path; value = $_.CookedValue } })
+    total_memory_kb = [math]::Round($computer.TotalPhysicalMemory / 1KB)
+    network_in_kb   = [math]::Round((($adapters | Measure-Object -Property ReceivedBytes -Sum).Sum / 1KB), 2)
+    network_out_kb  = [math]::Round((($adapters | Measure-Object -Property SentBytes -Sum).Sum / 1KB), 2)
+} | ConvertTo-Json -Compress -Depth 4
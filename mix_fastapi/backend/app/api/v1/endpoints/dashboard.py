@@ -6,8 +6,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc
 
 from app.core.database import get_db
-from app.models.models import System, Metric, Log
+from app.core.redis import redis_client
+from app.core.worker_database import POOL_STATS_PREFIX
+from app.models.models import Metric, Log
 from app.schemas.schemas import DashboardStats
+from app.services.system_stats import get_system_stats
+from app.tasks.locks import LOCK_PREFIX, STATS_KEY, parse_lock_stats
 
 
 router = APIRouter()
@@ -19,20 +23,8 @@ async def get_dashboard_stats(
 ):
     """Get dashboard statistics"""
     
-    # Count systems by status
-    systems_result = await db.execute(
-        select(
-            System.status,
-            func.count(System.id).label("count")
-        ).group_by(System.status)
-    )
-    systems_by_status = {row.status: row.count for row in systems_result}
-    
-    # Count total systems
-    total_systems_result = await db.execute(
-        select(func.count(System.id))
-    )
-    total_systems = total_systems_result.scalar()
+    # Count systems by status (one aggregate query)
+    system_stats = await get_system_stats(db)
     
     # Count total metrics
     total_metrics_result = await db.execute(
@@ -59,11 +51,36 @@ async def get_dashboard_stats(
         await db.refresh(log, ["system"])
     
     return DashboardStats(
-        total_systems=total_systems or 0,
-        online_systems=systems_by_status.get("online", 0),
-        offline_systems=systems_by_status.get("offline", 0),
-        warning_systems=systems_by_status.get("warning", 0),
+        total_systems=system_stats["total"],
+        online_systems=system_stats["by_status"]["online"],
+        offline_systems=system_stats["by_status"]["offline"],
+        warning_systems=system_stats["by_status"]["warning"],
         total_metrics=total_metrics or 0,
         total_logs=total_logs or 0,
         recent_logs=recent_logs
     )
+
+
+@router.get("/task-locks")
+async def get_task_lock_stats():
+    """
+    Collection runs per task and host group: started, skipped because the
+    previous run was still going, locks lost mid-run and currently running
+    """
+    counters = await redis_client.hgetall(STATS_KEY)
+    lock_keys = [key async for key in redis_client.scan_iter(match=f"{LOCK_PREFIX}:*")]
+    
+    return parse_lock_stats(counters, lock_keys)
+
+
+@router.get("/worker-db")
+async def get_worker_db_stats():
+    """Database pool counters published by each Celery worker process"""
+    stats = []
+    async for key in redis_client.scan_iter(match=f"{POOL_STATS_PREFIX}:*"):
+        values = await redis_client.hgetall(key)
+        if values:
+            host = key.split(":")[1]
+            stats.append({"host": host, **{name: int(value) for name, value in values.items()}})
+    
+    return sorted(stats, key=lambda entry: (entry["host"], entry["pid"]))
@@ -4,16 +4,22 @@ Logs API Endpoints
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
+from sqlalchemy.orm import contains_eager
 from typing import List, Optional
 from datetime import datetime, timedelta
 
 from app.core.database import get_db
+from app.core.responses import FastJSONResponse, RowSerializer
 from app.models.models import Log, System
-from app.schemas.schemas import Log as LogSchema, LogCreate, LogWithSystem
+from app.schemas.schemas import (
+    Log as LogSchema, LogCreate, LogWithSystem, System as SystemSchema
+)
 
 
 router = APIRouter()
 
+log_with_system_row = RowSerializer(LogWithSystem, nested={"system": RowSerializer(SystemSchema)})
+
 
 @router.get("/", response_model=List[LogWithSystem])
 async def get_logs(
@@ -25,7 +31,7 @@ async def get_logs(
     db: AsyncSession = Depends(get_db)
 ):
     """Get logs with optional filtering"""
-    query = select(Log).join(System)
+    query = select(Log).join(System).options(contains_eager(Log.system))
     
     # Filter by system
     if system_id:
@@ -46,11 +52,7 @@ async def get_logs(
     result = await db.execute(query)
     logs = result.scalars().all()
     
-    # Load relationships
-    for log in logs:
-        await db.refresh(log, ["system"])
-    
-    return logs
+    return FastJSONResponse([log_with_system_row(log) for log in logs])
 
 
 @router.get("/recent", response_model=List[LogWithSystem])
@@ -61,6 +63,8 @@ async def get_recent_logs(
     """Get most recent logs"""
     query = (
         select(Log)
+        .join(System)
+        .options(contains_eager(Log.system))
         .order_by(desc(Log.timestamp))
         .limit(limit)
     )
@@ -68,11 +72,7 @@ async def get_recent_logs(
     result = await db.execute(query)
     logs = result.scalars().all()
     
-    # Load relationships
-    for log in logs:
-        await db.refresh(log, ["system"])
-    
-    return logs
+    return FastJSONResponse([log_with_system_row(log) for log in logs])
 
 
 @router.get("/{log_id}", response_model=LogSchema)
@@ -3,17 +3,30 @@ Metrics API Endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func, desc, update
+from sqlalchemy.orm import contains_eager
 from typing import List, Optional
 from datetime import datetime, timedelta
+import time
 
 from app.core.database import get_db
+from app.core.responses import FastJSONResponse, RowSerializer, numeric_mode
 from app.models.models import Metric, System
-from app.schemas.schemas import Metric as MetricSchema, MetricCreate, MetricWithSystem
+from app.schemas.schemas import (
+    Metric as MetricSchema, MetricCreate, MetricWithSystem, WindowsMetricIngest,
+    System as SystemSchema
+)
+from app.services.heartbeats import heartbeat_index
+from app.services.network_rates import network_rate_service
+from app.services.windows_metrics import parse_windows_sample
 
 
 router = APIRouter()
 
+metric_with_system_row = RowSerializer(
+    MetricWithSystem, nested={"system": RowSerializer(SystemSchema)}
+)
+
 
 @router.get("/", response_model=List[MetricWithSystem])
 async def get_metrics(
@@ -21,10 +34,11 @@ async def get_metrics(
     limit: int = Query(100, ge=1, le=1000),
     system_id: Optional[int] = None,
     hours: Optional[int] = Query(None, ge=1, le=720),  # Last N hours
+    numeric: str = Depends(numeric_mode),
     db: AsyncSession = Depends(get_db)
 ):
     """Get metrics with optional filtering"""
-    query = select(Metric).join(System)
+    query = select(Metric).join(System).options(contains_eager(Metric.system))
     
     # Filter by system
     if system_id:
@@ -41,15 +55,12 @@ async def get_metrics(
     result = await db.execute(query)
     metrics = result.scalars().all()
     
-    # Load relationships
-    for metric in metrics:
-        await db.refresh(metric, ["system"])
-    
-    return metrics
+    return FastJSONResponse([metric_with_system_row(m) for m in metrics], numeric=numeric)
 
 
 @router.get("/latest", response_model=List[MetricWithSystem])
 async def get_latest_metrics(
+    numeric: str = Depends(numeric_mode),
     db: AsyncSession = Depends(get_db)
 ):
     """Get latest metric for each system"""
@@ -71,16 +82,14 @@ async def get_latest_metrics(
             (Metric.system_id == subquery.c.system_id) &
             (Metric.timestamp == subquery.c.max_timestamp)
         )
+        .join(System)
+        .options(contains_eager(Metric.system))
     )
     
     result = await db.execute(query)
     metrics = result.scalars().all()
     
-    # Load relationships
-    for metric in metrics:
-        await db.refresh(metric, ["system"])
-    
-    return metrics
+    return FastJSONResponse([metric_with_system_row(m) for m in metrics], numeric=numeric)
 
 
 @router.get("/{metric_id}", response_model=MetricSchema)
@@ -115,13 +124,30 @@ async def create_metric(
     if not system:
         raise HTTPException(status_code=404, detail="System not found")
     
-    # Create metric
-    metric = Metric(**metric_data.model_dump())
+    # Create metric, deriving network rates from the cumulative counters.
+    # received_at is the epoch for Redis (heartbeat scores, rate samples):
+    # utcnow() is naive and .timestamp() would read it as local time
+    received_at = time.time()
+    now = datetime.utcfromtimestamp(received_at)
+    network_in_rate, network_out_rate = await network_rate_service.compute_rates(
+        metric_data.system_id,
+        float(metric_data.network_in),
+        float(metric_data.network_out),
+        received_at
+    )
+    metric = Metric(
+        **metric_data.model_dump(),
+        network_in_rate=network_in_rate,
+        network_out_rate=network_out_rate,
+        timestamp=now
+    )
     db.add(metric)
     
-    # Update system last_seen and status
-    system.last_seen = datetime.utcnow()
-    system.status = "online"
+    # last_seen/status go to the Redis heartbeat index (written back to the
+    # systems table by the status sweep); update the row only without Redis
+    if not await heartbeat_index.record([system.id], received_at):
+        system.last_seen = now
+        system.status = "online"
     
     await db.commit()
     await db.refresh(metric)
@@ -129,15 +155,52 @@ async def create_metric(
     return metric
 
 
+@router.post("/windows", response_model=MetricSchema, status_code=201)
+async def create_windows_metric(
+    ingest: WindowsMetricIngest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create metric from the bundled Windows counter sample"""
+    try:
+        metric_data = parse_windows_sample(ingest.system_id, ingest.sample)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    return await create_metric(metric_data, db)
+
+
 @router.post("/bulk", response_model=List[MetricSchema], status_code=201)
 async def create_metrics_bulk(
     metrics_data: List[MetricCreate],
     db: AsyncSession = Depends(get_db)
 ):
     """Create multiple metrics at once"""
-    metrics = [Metric(**data.model_dump()) for data in metrics_data]
+    received_at = time.time()
+    now = datetime.utcfromtimestamp(received_at)
+    rates = await network_rate_service.compute_rates_many([
+        (data.system_id, float(data.network_in), float(data.network_out), received_at)
+        for data in metrics_data
+    ])
+    metrics = [
+        Metric(
+            **data.model_dump(),
+            network_in_rate=network_in_rate,
+            network_out_rate=network_out_rate,
+            timestamp=now
+        )
+        for data, (network_in_rate, network_out_rate) in zip(metrics_data, rates)
+    ]
     
     db.add_all(metrics)
+    
+    system_ids = {data.system_id for data in metrics_data}
+    if not await heartbeat_index.record(system_ids, received_at):
+        await db.execute(
+            update(System)
+            .where(System.id.in_(system_ids))
+            .values(last_seen=now, status="online")
+        )
+    
     await db.commit()
     
     for metric in metrics:
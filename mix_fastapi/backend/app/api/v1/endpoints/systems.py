@@ -1,19 +1,36 @@
 """
 Systems API Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from collections import Counter
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.models import System
-from app.schemas.schemas import System as SystemSchema, SystemCreate, SystemUpdate
+from app.schemas.schemas import (
+    System as SystemSchema, SystemCreate, SystemUpdate,
+    SystemBulkCreate, BulkOnboardingResponse, Job, ConnectionTestStatus,
+    MonitoringRequest
+)
 from app.services.ansible_service import ansible_service
+from app.services.connectivity import get_cached_result, start_connection_test_job
+from app.services.dynamic_inventory import InventoryCache, build_inventory, build_query
+from app.services.heartbeats import heartbeat_index
+from app.services.jobs import job_store
+from app.services.system_stats import get_system_stats
+from app.tasks.results import load_run_events
 
 
 router = APIRouter()
 
+inventory_cache = InventoryCache(ttl=settings.INVENTORY_CACHE_TTL)
+
 
 @router.get("/", response_model=List[SystemSchema])
 async def get_systems(
@@ -38,7 +55,34 @@ async def get_systems(
     result = await db.execute(query)
     systems = result.scalars().all()
     
-    return systems
+    # Live status from the heartbeat index
+    return await heartbeat_index.overlay([
+        SystemSchema.model_validate(system).model_dump() for system in systems
+    ])
+
+
+@router.get("/ansible/inventory")
+async def get_ansible_inventory(
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    slot: Optional[str] = Query(None, pattern=r"^\d+/\d+$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Dynamic Ansible inventory generated from the systems table"""
+    key = (type, status, slot)
+    inventory = inventory_cache.get(key)
+    
+    if inventory is None:
+        try:
+            query = build_query(system_type=type, status=status, slot=slot)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        result = await db.execute(query)
+        inventory = build_inventory(result.all())
+        inventory_cache.set(key, inventory)
+    
+    return inventory
 
 
 @router.get("/{system_id}", response_model=SystemSchema)
@@ -55,16 +99,21 @@ async def get_system(
     if not system:
         raise HTTPException(status_code=404, detail="System not found")
     
-    return system
+    systems = await heartbeat_index.overlay([SystemSchema.model_validate(system).model_dump()])
+    return systems[0]
 
 
 @router.post("/ansible/", response_model=SystemSchema, status_code=201)
 async def create_system_with_ansible(
     system_data: dict,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Create new system and configure Ansible connection
+    
+    The connectivity test runs as a background job whose id is returned in
+    the X-Connection-Test-Job header (poll /ansible/jobs/{job_id})
     """
     try:
         # Extract Ansible credentials
@@ -114,19 +163,9 @@ async def create_system_with_ansible(
                 detail="Error al configurar Ansible para el sistema"
             )
         
-        # Test connection
-        connection_result = await ansible_service.test_connection(system.name)
-        
-        if not connection_result.get("success"):
-            # Update system status to offline if connection fails
-            system.status = "offline"
-            await db.commit()
-            await db.refresh(system)
-        else:
-            # Update system status to online
-            system.status = "online"
-            await db.commit()
-            await db.refresh(system)
+        # Test connection in the background; the status is updated when the job finishes
+        job_id = await start_connection_test_job([(system.id, system.name)])
+        response.headers["X-Connection-Test-Job"] = job_id
         
         return system
     
@@ -136,6 +175,171 @@ async def create_system_with_ansible(
         raise HTTPException(status_code=500, detail=f"Error al crear el sistema: {str(e)}")
 
 
+@router.post("/ansible/bulk", response_model=BulkOnboardingResponse, status_code=202)
+async def create_systems_bulk_with_ansible(
+    bulk_data: SystemBulkCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many systems in one transaction, write the Ansible inventory once
+    and test connectivity in the background (poll /ansible/jobs/{job_id})
+    """
+    names = [system.name for system in bulk_data.systems]
+    
+    duplicated = {name for name, count in Counter(names).items() if count > 1}
+    if duplicated:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Nombres repetidos en la petición: {', '.join(sorted(duplicated))}"
+        )
+    
+    # Check existing names with a single query
+    result = await db.execute(select(System.name).filter(System.name.in_(names)))
+    existing = result.scalars().all()
+    
+    if existing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Ya existen sistemas con estos nombres: {', '.join(sorted(existing))}"
+        )
+    
+    credentials_fields = {"ansible_password", "ansible_become"}
+    systems = [
+        System(**system.model_dump(exclude=credentials_fields))
+        for system in bulk_data.systems
+    ]
+    db.add_all(systems)
+    
+    # Rows first: the inventory only gets hosts that exist in the database
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Otro proceso creó sistemas con estos nombres al mismo tiempo"
+        )
+    
+    # Single inventory write for the whole batch
+    ansible_success = await ansible_service.add_systems_to_inventory([
+        {
+            "name": system.name,
+            "ip_address": system.ip_address,
+            "system_type": system.type,
+            "ansible_user": system.ansible_user,
+            "ansible_password": system.ansible_password,
+            "ansible_port": system.ansible_port,
+            "ansible_become": system.ansible_become,
+        }
+        for system in bulk_data.systems
+    ])
+    
+    if not ansible_success:
+        # Compensate: drop the rows committed above
+        await db.execute(delete(System).where(System.id.in_([system.id for system in systems])))
+        await db.commit()
+        raise HTTPException(
+            status_code=500,
+            detail="Error al configurar Ansible para los sistemas"
+        )
+    
+    job_id = await start_connection_test_job([(system.id, system.name) for system in systems])
+    
+    return BulkOnboardingResponse(
+        job_id=job_id,
+        systems=[SystemSchema.model_validate(system) for system in systems]
+    )
+
+
+@router.post("/ansible/monitoring")
+async def run_monitoring(
+    monitoring_data: MonitoringRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Run the shared monitoring playbooks for many systems in one invocation per type"""
+    result = await db.execute(
+        select(System.name).filter(System.id.in_(monitoring_data.system_ids))
+    )
+    names = result.scalars().all()
+    
+    if not names:
+        raise HTTPException(status_code=404, detail="No systems found")
+    
+    return await ansible_service.run_monitoring(names)
+
+
+@router.get("/ansible/monitoring/stream")
+async def stream_monitoring(
+    system_ids: List[int] = Query(..., min_length=1),
+    db: AsyncSession = Depends(get_db)
+):
+    """Run the monitoring playbooks streaming Ansible output as Server-Sent Events"""
+    result = await db.execute(
+        select(System.name).filter(System.id.in_(system_ids))
+    )
+    names = result.scalars().all()
+    
+    if not names:
+        raise HTTPException(status_code=404, detail="No systems found")
+    
+    return StreamingResponse(
+        ansible_service.stream_monitoring(names),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/{system_id}/test-connection", response_model=ConnectionTestStatus, status_code=202)
+async def test_system_connection(
+    system_id: int,
+    response: Response,
+    force: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Return the cached reachability (200) or start a background connection test (202)"""
+    if not force:
+        cached = await get_cached_result(system_id)
+        if cached:
+            response.status_code = 200
+            return ConnectionTestStatus(system_id=system_id, cached=True, result=cached)
+    
+    result = await db.execute(select(System.name).filter(System.id == system_id))
+    name = result.scalar_one_or_none()
+    
+    if not name:
+        raise HTTPException(status_code=404, detail="System not found")
+    
+    job_id = await start_connection_test_job([(system_id, name)])
+    
+    return ConnectionTestStatus(system_id=system_id, cached=False, job_id=job_id)
+
+
+@router.get("/ansible/jobs/{job_id}", response_model=Job)
+async def get_ansible_job(job_id: str):
+    """Get background job status and per-host results"""
+    job = await job_store.get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+
+@router.get("/ansible/runs/{artifact_id}/events")
+async def get_ansible_run_events(
+    artifact_id: str,
+    event: Optional[str] = Query(None, description="e.g. runner_on_ok, runner_on_failed"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Events of a Celery Ansible run, read from its artifact directory"""
+    events = await asyncio.to_thread(load_run_events, artifact_id, event, limit)
+    
+    if events is None:
+        raise HTTPException(status_code=404, detail="Run artifacts not found")
+    
+    return events
+
+
 @router.post("/", response_model=SystemSchema, status_code=201)
 async def create_system(
     system_data: SystemCreate,
@@ -213,19 +417,12 @@ async def delete_system(
 async def get_systems_count(
     db: AsyncSession = Depends(get_db)
 ):
-    """Get systems count by status"""
-    result = await db.execute(
-        select(
-            System.status,
-            func.count(System.id).label("count")
-        ).group_by(System.status)
-    )
-    
-    stats = {row.status: row.count for row in result}
+    """Get systems count by status and type (one aggregate query)"""
+    stats = await get_system_stats(db)
     
     return {
-        "total": sum(stats.values()),
-        "online": stats.get("online", 0),
-        "offline": stats.get("offline", 0),
-        "warning": stats.get("warning", 0),
+        "total": stats["total"],
+        **stats["by_status"],
+        "by_type": stats["by_type"],
+        "by_type_status": stats["by_type_status"],
     }
@@ -3,8 +3,11 @@ Celery Application
 """
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import task_postrun
+from kombu import Queue
 
 from app.core.config import settings
+from app.core.worker_database import publish_pool_stats
 
 
 # Create Celery app
@@ -23,8 +26,31 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
+    result_expires=settings.CELERY_RESULT_EXPIRES,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
+    
+    # Queues: long Ansible runs never share workers with short tasks
+    #   collect     -> Ansible playbooks (minutes)
+    #   ingest      -> short data tasks (seconds)
+    #   maintenance -> status sweep and retention
+    task_queues=(
+        Queue("collect"),
+        Queue("ingest"),
+        Queue("maintenance"),
+    ),
+    task_default_queue="ingest",
+    task_routes={
+        "app.tasks.ansible_tasks.*": {"queue": "collect"},
+        "app.tasks.maintenance_tasks.*": {"queue": "maintenance"},
+    },
+    
+    # Reserve one task at a time and ack after it finishes, so a worker busy
+    # with a playbook doesn't hold other tasks prefetched behind it
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    # Must exceed task_time_limit or late-acked tasks are redelivered
+    broker_transport_options={"visibility_timeout": 60 * 60},
 )
 
 # Celery Beat schedule
@@ -45,8 +71,23 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.maintenance_tasks.cleanup_old_metrics",
         "schedule": crontab(hour=2, minute=0),  # Daily at 2 AM
     },
+    "cleanup-old-logs": {
+        "task": "app.tasks.maintenance_tasks.cleanup_old_logs",
+        "schedule": crontab(hour=2, minute=30),  # Daily at 2:30 AM
+    },
     "update-system-statuses": {
         "task": "app.tasks.maintenance_tasks.update_system_statuses",
         "schedule": 60.0,  # Every minute
+        "options": {"expires": 60},  # Drop if the next run is already due
     },
 }
+
+
+@task_postrun.connect
+def publish_worker_db_stats(**kwargs):
+    """Pool counters of the worker process, read by GET /dashboard/worker-db"""
+    try:
+        publish_pool_stats()
+    except Exception:
+        # Stats are best effort, never fail a task over them
+        pass
@@ -16,9 +16,20 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "postgresql+asyncpg://postgres:postgres@db:5432/monitoreo_infra"
     
+    # Celery worker database pool (per worker process, sync psycopg2)
+    WORKER_DB_POOL_SIZE: int = 1  # prefork children run one task at a time
+    WORKER_DB_MAX_OVERFLOW: int = 2
+    WORKER_DB_POOL_RECYCLE: int = 1800  # seconds
+    WORKER_DB_STATS_TTL: int = 300  # seconds a published pool snapshot is kept
+    
     # Redis
     REDIS_URL: str = "redis://redis:6379/0"
     
+    # Network counters (last sample per system used to derive KB/s rates)
+    NETWORK_COUNTER_BACKEND: str = "redis"  # redis, memory
+    NETWORK_COUNTER_MAX_GAP: int = 900  # seconds
+    NETWORK_COUNTER_TTL: int = 3600  # seconds
+    
     # CORS
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -34,6 +45,38 @@ class Settings(BaseSettings):
     # Ansible
     ANSIBLE_INVENTORY_PATH: str = "/app/ansible/inventory/hosts.yml"
     ANSIBLE_PLAYBOOKS_PATH: str = "/app/ansible/playbooks"
+    ANSIBLE_DYNAMIC_INVENTORY_PATH: str = "/app/ansible/inventory/db_inventory.py"
+    ANSIBLE_INVENTORY_SOURCE: str = "static"  # static (hosts.yml), database
+    INVENTORY_CACHE_TTL: int = 30  # seconds
+    ANSIBLE_CONNECTION_TEST_CONCURRENCY: int = 20
+    ANSIBLE_MONITORING_FORKS: int = 50
+    ANSIBLE_OUTPUT_TAIL_LINES: int = 200  # lines kept from each stream
+    ANSIBLE_OUTPUT_TAIL_LINE_CHARS: int = 2000  # chars kept per tail line
+    ANSIBLE_OUTPUT_MAX_LINE: int = 1024 * 1024  # bytes read per line (JSON events)
+    CONNECTION_TEST_TTL: int = 300  # seconds a reachability result is reused
+    
+    # System status from last_seen (maintenance sweep every minute)
+    SYSTEM_WARNING_AFTER: int = 300  # seconds without data -> warning
+    SYSTEM_OFFLINE_AFTER: int = 600  # seconds without data -> offline
+    HEARTBEAT_FULL_SWEEP_INTERVAL: int = 900  # seconds between full table sweeps
+    
+    # Retention (batched deletes of old metrics/logs)
+    RETENTION_BATCH_SIZE: int = 5000  # rows per DELETE
+    RETENTION_BATCH_SLEEP: float = 0.5  # seconds between batches
+    RETENTION_MAX_RUNTIME: int = 20 * 60  # seconds per task, below the soft time limit
+    RETENTION_RESUME_DELAY: int = 60  # seconds before an unfinished run continues
+    
+    # Celery results (compact summaries, full output in the artifact store)
+    CELERY_RESULT_EXPIRES: int = 24 * 60 * 60  # seconds
+    TASK_RESULT_MAX_HOSTS: int = 100  # failed hosts listed in a result
+    ANSIBLE_RUNNER_DIR: str = "/tmp/ansible"  # private_data_dir, artifacts/<id>
+    ANSIBLE_ARTIFACTS_KEEP: int = 200  # newest runs kept on disk
+    
+    # Celery task locks (one collection run per task and host group)
+    TASK_LOCK_TTL: int = 120  # seconds, renewed by a heartbeat every TTL/3
+    
+    # Background jobs (connection tests, bulk onboarding)
+    JOB_TTL: int = 3600  # seconds
     
     class Config:
         env_file = ".env"
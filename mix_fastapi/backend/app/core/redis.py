@@ -0,0 +1,36 @@
+"""
+Redis Configuration
+"""
+from typing import Optional
+
+import redis
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+
+
+# Shared async Redis client (connections are opened lazily from its pool)
+redis_client = aioredis.from_url(
+    settings.REDIS_URL,
+    encoding="utf-8",
+    decode_responses=True,
+)
+
+
+async def get_redis():
+    """Dependency to get the shared Redis client"""
+    return redis_client
+
+
+_sync_client: Optional[redis.Redis] = None
+
+
+def get_sync_redis() -> redis.Redis:
+    """
+    Sync client for Celery tasks, created on first use so each forked
+    worker opens its own connection pool
+    """
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _sync_client
@@ -0,0 +1,71 @@
+"""
+Fast JSON responses (orjson) for large list endpoints
+"""
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Type
+
+import orjson
+from fastapi import Query
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def numeric_mode(
+    numeric: str = Query(
+        "string",
+        pattern="^(string|float)$",
+        description="Decimal fields as JSON strings (exact, default) or floats",
+    )
+) -> str:
+    """Dependency for the ?numeric= query parameter"""
+    return numeric
+
+
+def _decimal_as_str(obj: Any) -> str:
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _decimal_as_float(obj: Any) -> float:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson response for content built from trusted DB rows
+
+    Returning it from an endpoint skips the response_model validation; the
+    response_model still documents the shape in OpenAPI.
+    """
+
+    def __init__(self, content: Any, numeric: str = "string", **kwargs: Any):
+        self.default: Callable[[Any], Any] = (
+            _decimal_as_float if numeric == "float" else _decimal_as_str
+        )
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class RowSerializer:
+    """
+    Turns ORM objects into dicts with the fields of a response schema
+
+    The field names are taken once from the schema, so each row is just a
+    getattr per field, with no Pydantic validation.
+    """
+
+    def __init__(self, schema: Type[BaseModel], nested: Optional[Dict[str, "RowSerializer"]] = None):
+        self.nested = nested or {}
+        self.fields = tuple(name for name in schema.model_fields if name not in self.nested)
+
+    def __call__(self, obj: Any) -> Dict[str, Any]:
+        data = {name: getattr(obj, name) for name in self.fields}
+        for name, serializer in self.nested.items():
+            related = getattr(obj, name)
+            data[name] = serializer(related) if related is not None else None
+        return data
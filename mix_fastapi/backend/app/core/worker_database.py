@@ -0,0 +1,109 @@
+"""
+Worker Database Configuration (synchronous, for Celery tasks)
+"""
+import os
+import socket
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.redis import get_sync_redis
+
+
+POOL_STATS_PREFIX = "worker_db"
+
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_pid: Optional[int] = None
+# Connections opened / checked out by this process (connection churn)
+_counters: Dict[str, int] = {"connects": 0, "checkouts": 0}
+
+
+def sync_database_url(url: str) -> str:
+    """Same database as the API, through psycopg2 instead of asyncpg"""
+    return url.replace("+asyncpg", "+psycopg2")
+
+
+def get_worker_engine() -> Engine:
+    """
+    Engine of the current worker process
+
+    Created on first use and again after a fork, so prefork children never
+    share the parent's connections. Each child runs one task at a time, so
+    the pool is sized per process (WORKER_DB_POOL_SIZE), not like the API's.
+    """
+    global _engine, _session_factory, _pid
+
+    if _engine is None or _pid != os.getpid():
+        if _engine is not None:
+            # Inherited from the parent: drop the pool without closing its sockets
+            _engine.dispose(close=False)
+
+        _engine = create_engine(
+            sync_database_url(settings.DATABASE_URL),
+            pool_size=settings.WORKER_DB_POOL_SIZE,
+            max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+            pool_recycle=settings.WORKER_DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+        _session_factory = sessionmaker(_engine, expire_on_commit=False)
+        _pid = os.getpid()
+        _counters.update(connects=0, checkouts=0)
+
+        event.listen(_engine, "connect", lambda *args: _count("connects"))
+        event.listen(_engine, "checkout", lambda *args: _count("checkouts"))
+
+    return _engine
+
+
+def _count(name: str) -> None:
+    _counters[name] += 1
+
+
+def WorkerSession() -> Session:
+    """
+    New session on the worker engine
+
+    Usage:
+        with WorkerSession() as session:
+            ...
+            session.commit()
+    """
+    get_worker_engine()
+    return _session_factory()
+
+
+def pool_stats() -> Dict[str, int]:
+    """Connection pool counters of the current worker process"""
+    stats = {"pid": os.getpid(), "size": 0, "checked_in": 0, "checked_out": 0, "overflow": 0}
+    if _engine is None or _pid != os.getpid():
+        return {**stats, "connects": 0, "checkouts": 0}
+
+    pool = _engine.pool
+    stats.update(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=pool.overflow(),
+    )
+    return {**stats, **_counters}
+
+
+def publish_pool_stats() -> None:
+    """
+    Store this process's pool counters in Redis (worker_db:<host>:<pid>)
+
+    Called after every task; the key expires when the process goes away.
+    """
+    if _engine is None or _pid != os.getpid():
+        return
+
+    key = f"{POOL_STATS_PREFIX}:{socket.gethostname()}:{_pid}"
+    client = get_sync_redis()
+    with client.pipeline(transaction=False) as pipe:
+        pipe.hset(key, mapping=pool_stats())
+        pipe.expire(key, settings.WORKER_DB_STATS_TTL)
+        pipe.execute()
@@ -3,10 +3,12 @@ FastAPI Main Application
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.core.redis import redis_client
 from app.api.v1.router import api_router
 
 
@@ -21,6 +23,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown: Close connections
     await engine.dispose()
+    await redis_client.close()
 
 
 # Create FastAPI app
@@ -31,6 +34,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -1,7 +1,7 @@
 """
 SQLAlchemy Models
 """
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Text, Enum, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -37,18 +37,24 @@ class System(Base):
     __tablename__ = "systems"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False, index=True)
+    name = Column(String(255), nullable=False, unique=True, index=True)
     type = Column(Enum(SystemType), nullable=False, index=True)
     ip_address = Column(String(45), nullable=False)
     status = Column(Enum(SystemStatus), default=SystemStatus.OFFLINE, index=True)
     version = Column(String(100), nullable=True)
-    last_seen = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Last metric received: set only by metric ingest and the heartbeat
+    # write-back (null until the system first reports)
+    last_seen = Column(DateTime, nullable=True)
     
     # Ansible configuration
     ansible_user = Column(String(100), default="ansible")
     ansible_port = Column(Integer, default=22)
     ansible_connection = Column(String(50), default="ssh")  # ssh, winrm, psrp
     
+    # Last Ansible connectivity test (null until the first test finishes)
+    reachable = Column(Boolean, nullable=True)
+    last_checked = Column(DateTime, nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -74,6 +80,8 @@ class Metric(Base):
     disk_usage = Column(Numeric(5, 2), nullable=False)  # Percentage
     network_in = Column(Numeric(15, 2), default=0)  # KB
     network_out = Column(Numeric(15, 2), default=0)  # KB
+    network_in_rate = Column(Numeric(15, 2), nullable=True)  # KB/s
+    network_out_rate = Column(Numeric(15, 2), nullable=True)  # KB/s
     
     # Timestamp
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
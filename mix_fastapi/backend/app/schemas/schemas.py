@@ -44,6 +44,17 @@ class SystemCreate(SystemBase):
     pass
 
 
+class SystemAnsibleCreate(SystemBase):
+    """Schema for creating system with Ansible credentials"""
+    ansible_password: str = Field(..., min_length=1)
+    ansible_become: Optional[str] = Field(None, pattern="^(sudo|su)$")
+
+
+class SystemBulkCreate(BaseModel):
+    """Schema for onboarding many systems at once"""
+    systems: List[SystemAnsibleCreate] = Field(..., min_length=1, max_length=1000)
+
+
 class SystemUpdate(BaseModel):
     """Schema for updating system"""
     name: Optional[str] = Field(None, min_length=1, max_length=255)
@@ -60,7 +71,9 @@ class System(SystemBase):
     """Schema for system response"""
     id: int
     status: str
-    last_seen: datetime
+    last_seen: Optional[datetime] = None
+    reachable: Optional[bool] = None
+    last_checked: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
@@ -68,6 +81,47 @@ class System(SystemBase):
         from_attributes = True
 
 
+# Job Schemas
+class ConnectionTestResult(BaseModel):
+    """Result of an Ansible connectivity test for one host"""
+    name: str
+    system_id: Optional[int] = None
+    success: bool
+    message: str
+    checked_at: datetime
+
+
+class Job(BaseModel):
+    """Background job status"""
+    job_id: str
+    kind: str
+    status: str
+    total: int
+    completed: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    results: List[ConnectionTestResult] = []
+
+
+class MonitoringRequest(BaseModel):
+    """Systems to monitor in one Ansible run"""
+    system_ids: List[int] = Field(..., min_length=1, max_length=5000)
+
+
+class ConnectionTestStatus(BaseModel):
+    """Cached connectivity result or the job started to refresh it"""
+    system_id: int
+    cached: bool
+    job_id: Optional[str] = None
+    result: Optional[ConnectionTestResult] = None
+
+
+class BulkOnboardingResponse(BaseModel):
+    """Systems created by a bulk onboarding request"""
+    job_id: str
+    systems: List[System]
+
+
 # Metric Schemas
 class MetricBase(BaseModel):
     """Base metric schema"""
@@ -87,6 +141,8 @@ class Metric(MetricBase):
     """Schema for metric response"""
     id: int
     system_id: int
+    network_in_rate: Optional[Decimal] = None
+    network_out_rate: Optional[Decimal] = None
     timestamp: datetime
     
     class Config:
@@ -98,6 +154,26 @@ class MetricWithSystem(Metric):
     system: System
 
 
+class WindowsCounter(BaseModel):
+    """Single Get-Counter sample"""
+    path: str
+    value: float
+
+
+class WindowsCounterSample(BaseModel):
+    """Raw output of the bundled Windows collection script"""
+    counters: List[WindowsCounter]
+    total_memory_kb: float = Field(..., gt=0)
+    network_in_kb: float = Field(default=0, ge=0)
+    network_out_kb: float = Field(default=0, ge=0)
+
+
+class WindowsMetricIngest(BaseModel):
+    """Schema for ingesting a Windows counter sample"""
+    system_id: int
+    sample: WindowsCounterSample
+
+
 # Log Schemas
 class LogBase(BaseModel):
     """Base log schema"""
@@ -2,11 +2,26 @@
 Ansible Service - Gestión de configuración y conexiones con Ansible
 """
 import os
-import yaml
+import re
+import json
 import asyncio
+import tempfile
 from pathlib import Path
-from typing import Dict, Any, Optional
-from jinja2 import Template
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.inventory_store import InventoryStore
+from app.services.process_output import LineCallback, run_streaming
+
+
+# Playbooks de monitoreo compartidos (uno por tipo, ejecutados con --limit)
+MONITORING_PLAYBOOKS = {
+    "linux": "monitor_linux.yml",
+    "windows": "monitor_windows.yml",
+}
+
+# Línea de "ansible -o": host | SUCCESS => {...}
+PING_LINE = re.compile(r"^(\S+) \| (SUCCESS|UNREACHABLE!|FAILED!)")
 
 
 class AnsibleService:
@@ -21,6 +36,50 @@ class AnsibleService:
         # Crear directorios si no existen
         self.inventory_dir.mkdir(parents=True, exist_ok=True)
         self.playbooks_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Inventario indexado en memoria, con lock y escritura atómica
+        self.inventory = InventoryStore(self.inventory_file)
+    
+    def _build_host_entry(
+        self,
+        ip_address: str,
+        system_type: str,
+        ansible_user: str,
+        ansible_password: str,
+        ansible_port: int = 22,
+        ansible_become: Optional[str] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Devuelve el grupo y las variables de inventario de un sistema"""
+        # Determinar el grupo según el tipo
+        if system_type == "windows":
+            group = "windows_servers"
+            connection_type = "winrm"
+            extra_vars = {
+                "ansible_connection": connection_type,
+                "ansible_winrm_server_cert_validation": "ignore",
+                "ansible_winrm_transport": "ntlm"
+            }
+        else:  # linux o database
+            group = f"{system_type}_servers"
+            connection_type = "ssh"
+            extra_vars = {
+                "ansible_connection": connection_type,
+            }
+            if ansible_become:
+                extra_vars["ansible_become"] = "yes"
+                extra_vars["ansible_become_method"] = ansible_become
+                extra_vars["ansible_become_user"] = "root"
+        
+        # Configuración del host
+        host_vars = {
+            "ansible_host": ip_address,
+            "ansible_user": ansible_user,
+            "ansible_password": ansible_password,
+            "ansible_port": ansible_port,
+            **extra_vars
+        }
+        
+        return group, host_vars
     
     async def add_system_to_inventory(
         self,
@@ -47,50 +106,29 @@ class AnsibleService:
         Returns:
             bool: True si se agregó correctamente
         """
+        return await self.add_systems_to_inventory([{
+            "name": name,
+            "ip_address": ip_address,
+            "system_type": system_type,
+            "ansible_user": ansible_user,
+            "ansible_password": ansible_password,
+            "ansible_port": ansible_port,
+            "ansible_become": ansible_become,
+        }])
+    
+    async def add_systems_to_inventory(self, systems: List[Dict[str, Any]]) -> bool:
+        """
+        Agrega varios sistemas al inventario con una sola escritura
+        
+        Args:
+            systems: Lista de dicts con los argumentos de add_system_to_inventory
+        
+        Returns:
+            bool: True si se agregaron correctamente
+        """
         try:
-            # Leer inventario existente o crear uno nuevo
-            inventory = self._load_inventory()
-            
-            # Determinar el grupo según el tipo
-            if system_type == "windows":
-                group = "windows_servers"
-                connection_type = "winrm"
-                extra_vars = {
-                    "ansible_connection": connection_type,
-                    "ansible_winrm_server_cert_validation": "ignore",
-                    "ansible_winrm_transport": "ntlm"
-                }
-            else:  # linux o database
-                group = f"{system_type}_servers"
-                connection_type = "ssh"
-                extra_vars = {
-                    "ansible_connection": connection_type,
-                }
-                if ansible_become:
-                    extra_vars["ansible_become"] = "yes"
-                    extra_vars["ansible_become_method"] = ansible_become
-                    extra_vars["ansible_become_user"] = "root"
-            
-            # Agregar el host al grupo correspondiente
-            if group not in inventory:
-                inventory[group] = {"hosts": {}}
-            
-            # Configuración del host
-            host_vars = {
-                "ansible_host": ip_address,
-                "ansible_user": ansible_user,
-                "ansible_password": ansible_password,
-                "ansible_port": ansible_port,
-                **extra_vars
-            }
-            
-            inventory[group]["hosts"][name] = host_vars
-            
-            # Guardar inventario
-            self._save_inventory(inventory)
-            
-            # Crear playbook de monitoreo para el sistema
-            await self._create_monitoring_playbook(name, system_type)
+            # El lock de archivo puede esperar a otro worker: fuera del event loop
+            await asyncio.to_thread(self._upsert_hosts, systems)
             
             return True
         
@@ -98,76 +136,24 @@ class AnsibleService:
             print(f"Error al agregar sistema al inventario: {e}")
             return False
     
-    def _load_inventory(self) -> Dict[str, Any]:
-        """Carga el inventario de Ansible"""
-        if self.inventory_file.exists():
-            with open(self.inventory_file, 'r') as f:
-                return yaml.safe_load(f) or {}
-        return {}
-    
-    def _save_inventory(self, inventory: Dict[str, Any]) -> None:
-        """Guarda el inventario de Ansible"""
-        with open(self.inventory_file, 'w') as f:
-            yaml.dump(inventory, f, default_flow_style=False, sort_keys=False)
-    
-    async def _create_monitoring_playbook(self, name: str, system_type: str) -> None:
-        """Crea un playbook de monitoreo para el sistema"""
-        
-        if system_type == "windows":
-            playbook_content = f"""---
-- name: Monitorear {name} (Windows)
-  hosts: {name}
-  gather_facts: yes
-  
-  tasks:
-    - name: Obtener información del sistema
-      win_shell: |
-        $info = @{{}}
-        $info.hostname = $env:COMPUTERNAME
-        $info.os = (Get-WmiObject Win32_OperatingSystem).Caption
-        $info.cpu = (Get-WmiObject Win32_Processor).LoadPercentage
-        $info.memory = (Get-WmiObject Win32_OperatingSystem).FreePhysicalMemory
-        $info | ConvertTo-Json
-      register: system_info
-    
-    - name: Obtener servicios
-      win_service_info:
-      register: services_info
-    
-    - name: Mostrar información
-      debug:
-        msg: "{{{{ system_info.stdout }}}}"
-"""
-        else:  # linux o database
-            playbook_content = f"""---
-- name: Monitorear {name} (Linux)
-  hosts: {name}
-  gather_facts: yes
-  
-  tasks:
-    - name: Obtener uso de CPU
-      shell: top -bn1 | grep "Cpu(s)" | awk '{{print $2}}' | cut -d'%' -f1
-      register: cpu_usage
+    def _upsert_hosts(self, systems: List[Dict[str, Any]]) -> None:
+        """Escribe los hosts en el inventario dentro de una sola transacción"""
+        with self.inventory.transaction() as inventory:
+            for system in systems:
+                group, host_vars = self._build_host_entry(
+                    ip_address=system["ip_address"],
+                    system_type=system["system_type"],
+                    ansible_user=system["ansible_user"],
+                    ansible_password=system["ansible_password"],
+                    ansible_port=system.get("ansible_port", 22),
+                    ansible_become=system.get("ansible_become")
+                )
+                inventory.upsert_host(group, system["name"], host_vars)
     
-    - name: Obtener uso de memoria
-      shell: free | grep Mem | awk '{{print ($3/$2) * 100.0}}'
-      register: memory_usage
-    
-    - name: Obtener uso de disco
-      shell: df -h / | tail -n 1 | awk '{{print $5}}' | cut -d'%' -f1
-      register: disk_usage
-    
-    - name: Mostrar métricas
-      debug:
-        msg:
-          - "CPU: {{{{ cpu_usage.stdout }}}}%"
-          - "Memoria: {{{{ memory_usage.stdout }}}}%"
-          - "Disco: {{{{ disk_usage.stdout }}}}%"
-"""
-        
-        playbook_file = self.playbooks_dir / f"monitor_{name}.yml"
-        with open(playbook_file, 'w') as f:
-            f.write(playbook_content)
+    def _remove_host(self, name: str) -> None:
+        """Elimina un host del inventario dentro de una transacción"""
+        with self.inventory.transaction() as inventory:
+            inventory.remove_host(name)
     
     async def test_connection(self, name: str) -> Dict[str, Any]:
         """
@@ -188,25 +174,27 @@ class AnsibleService:
                 "-o"
             ]
             
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
+            # Con -o cada host es una línea "host | SUCCESS => {...}"
+            statuses: Dict[str, str] = {}
+            
+            async def on_line(stream: str, line: str) -> None:
+                match = PING_LINE.match(line)
+                if stream == "stdout" and match:
+                    statuses[match.group(1)] = match.group(2)
             
-            stdout, stderr = await process.communicate()
+            result = await run_streaming(cmd, on_line=on_line)
             
-            if process.returncode == 0:
+            if result.returncode == 0 and statuses.get(name) == "SUCCESS":
                 return {
                     "success": True,
                     "message": "Conexión exitosa",
-                    "output": stdout.decode()
+                    "output": result.stdout
                 }
             else:
                 return {
                     "success": False,
                     "message": "Error al conectar",
-                    "error": stderr.decode()
+                    "error": result.stderr or result.stdout
                 }
         
         except Exception as e:
@@ -215,6 +203,16 @@ class AnsibleService:
                 "message": f"Error al ejecutar Ansible: {str(e)}"
             }
     
+    def _monitoring_playbook_for(self, name: str) -> Optional[Path]:
+        """Playbook compartido según el tipo de conexión del host en el inventario"""
+        host_vars = self.inventory.get_host(name)
+        if host_vars is None:
+            return None
+        
+        if host_vars.get("ansible_connection") in ("winrm", "psrp"):
+            return self.playbooks_dir / MONITORING_PLAYBOOKS["windows"]
+        return self.playbooks_dir / MONITORING_PLAYBOOKS["linux"]
+    
     async def run_monitoring_playbook(self, name: str) -> Dict[str, Any]:
         """
         Ejecuta el playbook de monitoreo para un sistema
@@ -225,47 +223,137 @@ class AnsibleService:
         Returns:
             Dict con el resultado de la ejecución
         """
-        try:
-            playbook_file = self.playbooks_dir / f"monitor_{name}.yml"
-            
-            if not playbook_file.exists():
-                return {
+        result = await self.run_monitoring([name])
+        host_result = result["hosts"].get(name, {})
+        
+        return {
+            "success": host_result.get("success", False),
+            "message": host_result.get("message", ""),
+            "metrics": host_result.get("metrics"),
+        }
+    
+    async def run_monitoring(
+        self,
+        names: List[str],
+        on_line: Optional[LineCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta el monitoreo de muchos hosts con una invocación de
+        ansible-playbook por tipo de sistema (--limit con todos los hosts)
+        
+        Args:
+            names: Nombres de los sistemas
+            on_line: Callback opcional que recibe cada línea de salida (SSE)
+        
+        Returns:
+            Dict con el resultado general y el detalle por host
+        """
+        batches: Dict[Path, List[str]] = {}
+        hosts: Dict[str, Dict[str, Any]] = {}
+        
+        for name in names:
+            playbook_file = self._monitoring_playbook_for(name)
+            if playbook_file is None:
+                hosts[name] = {
                     "success": False,
-                    "message": "Playbook no encontrado"
-                }
-            
-            cmd = [
-                "ansible-playbook",
-                str(playbook_file),
-                "-i", str(self.inventory_file)
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode == 0:
-                return {
-                    "success": True,
-                    "message": "Playbook ejecutado correctamente",
-                    "output": stdout.decode()
+                    "message": "Sistema no encontrado en el inventario",
+                    "metrics": None,
                 }
             else:
-                return {
-                    "success": False,
-                    "message": "Error al ejecutar playbook",
-                    "error": stderr.decode()
-                }
+                batches.setdefault(playbook_file, []).append(name)
+        
+        results = await asyncio.gather(*(
+            self._run_playbook_batch(playbook_file, batch, on_line)
+            for playbook_file, batch in batches.items()
+        ))
+        for batch_result in results:
+            hosts.update(batch_result)
+        
+        return {
+            "success": bool(hosts) and all(host["success"] for host in hosts.values()),
+            "hosts": hosts,
+        }
+    
+    async def stream_monitoring(self, names: List[str]) -> AsyncIterator[str]:
+        """
+        Ejecuta run_monitoring y emite la salida completa como Server-Sent Events
+        
+        Eventos: "line" por cada línea de Ansible y "result" (o "error") al final.
+        La cola acotada aplica contrapresión: si el cliente lee lento, la
+        lectura del subproceso también se detiene.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        
+        async def on_line(stream: str, line: str) -> None:
+            await queue.put(("line", {"stream": stream, "line": line}))
         
+        async def runner() -> None:
+            try:
+                await queue.put(("result", await self.run_monitoring(names, on_line)))
+            except Exception as e:
+                await queue.put(("error", {"message": str(e)}))
+        
+        task = asyncio.create_task(runner())
+        try:
+            while True:
+                event, payload = await queue.get()
+                yield f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+                if event != "line":
+                    break
+        finally:
+            # Cliente desconectado: cancelar la ejecución (mata el subproceso)
+            if not task.done():
+                task.cancel()
+    
+    async def _run_playbook_batch(
+        self,
+        playbook_file: Path,
+        names: List[str],
+        on_line: Optional[LineCallback] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Ejecuta un playbook compartido para un lote de hosts con el callback jsonl"""
+        # Los hosts van en un archivo (--limit @archivo): miles de nombres en
+        # un solo argumento superan MAX_ARG_STRLEN y exec falla con E2BIG
+        with tempfile.NamedTemporaryFile("w", prefix="limit-", suffix=".txt", delete=False) as f:
+            f.write("\n".join(names) + "\n")
+            limit_file = Path(f.name)
+        
+        cmd = [
+            "ansible-playbook",
+            str(playbook_file),
+            "-i", str(self.inventory_file),
+            "--limit", f"@{limit_file}",
+            "--forks", str(settings.ANSIBLE_MONITORING_FORKS),
+        ]
+        # Un evento JSON por línea: los resultados se extraen mientras se ejecuta
+        env = {**os.environ, "ANSIBLE_STDOUT_CALLBACK": "ansible.posix.jsonl"}
+        parser = MonitoringEventParser()
+        
+        async def handle_line(stream: str, line: str) -> None:
+            if stream == "stdout":
+                parser.feed(line)
+            if on_line is not None:
+                await on_line(stream, line)
+        
+        try:
+            result = await run_streaming(cmd, env=env, on_line=handle_line)
+            error = result.stderr
         except Exception as e:
-            return {
+            error = str(e)
+        finally:
+            limit_file.unlink(missing_ok=True)
+        
+        hosts = parser.hosts
+        
+        # Hosts sin resultado: el playbook falló antes de llegar a ellos
+        for name in names:
+            hosts.setdefault(name, {
                 "success": False,
-                "message": f"Error: {str(e)}"
-            }
+                "message": error.strip()[-500:] or "Sin resultado de Ansible",
+                "metrics": None,
+            })
+        
+        return hosts
     
     async def remove_system_from_inventory(self, name: str, system_type: str) -> bool:
         """
@@ -279,20 +367,10 @@ class AnsibleService:
             bool: True si se eliminó correctamente
         """
         try:
-            inventory = self._load_inventory()
-            group = f"{system_type}_servers"
+            # El índice ubica el host en cualquier grupo, no solo en {system_type}_servers
+            await asyncio.to_thread(self._remove_host, name)
             
-            if group in inventory and "hosts" in inventory[group]:
-                if name in inventory[group]["hosts"]:
-                    del inventory[group]["hosts"][name]
-                    
-                    # Si el grupo queda vacío, eliminarlo
-                    if not inventory[group]["hosts"]:
-                        del inventory[group]
-                    
-                    self._save_inventory(inventory)
-            
-            # Eliminar playbook
+            # Eliminar playbook por host generado por versiones anteriores
             playbook_file = self.playbooks_dir / f"monitor_{name}.yml"
             if playbook_file.exists():
                 playbook_file.unlink()
@@ -304,5 +382,47 @@ class AnsibleService:
             return False
 
 
+class MonitoringEventParser:
+    """Extrae el resultado por host de los eventos del callback jsonl, línea a línea"""
+    
+    def __init__(self):
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+    
+    def _entry(self, host: str) -> Dict[str, Any]:
+        return self.hosts.setdefault(host, {"success": False, "message": "", "metrics": None})
+    
+    def feed(self, line: str) -> None:
+        if not line.startswith("{"):
+            return
+        
+        try:
+            event = json.loads(line)
+        except ValueError:
+            # Línea recortada por el límite de tamaño
+            return
+        
+        for host, task_result in (event.get("hosts") or {}).items():
+            entry = self._entry(host)
+            
+            if task_result.get("failed") or task_result.get("unreachable"):
+                entry["message"] = task_result.get("msg") or task_result.get("stderr", "")
+                continue
+            
+            stdout = (task_result.get("stdout") or "").strip()
+            if stdout.startswith("{"):
+                try:
+                    entry["metrics"] = json.loads(stdout)
+                except ValueError:
+                    pass
+        
+        for host, stats in (event.get("stats") or {}).items():
+            entry = self._entry(host)
+            entry["success"] = not stats.get("failures") and not stats.get("unreachable")
+            if entry["success"]:
+                entry["message"] = "Monitoreo ejecutado correctamente"
+            elif not entry["message"]:
+                entry["message"] = "Error al monitorear"
+
+
 # Instancia única del servicio
 ansible_service = AnsibleService()
@@ -0,0 +1,133 @@
+"""
+Connectivity Service - Pruebas de conexión Ansible concurrentes en segundo plano
+
+Las pruebas nunca se ejecutan dentro de la petición HTTP: se lanzan como
+trabajos y el resultado queda cacheado por sistema durante CONNECTION_TEST_TTL.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import redis_client
+from app.models.models import System
+from app.services.ansible_service import ansible_service
+from app.services.jobs import job_store
+
+
+logger = logging.getLogger(__name__)
+
+# Referencias a las tareas en curso para que el GC no las cancele
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def spawn(coro) -> asyncio.Task:
+    """Lanza una corrutina en segundo plano sin bloquear la petición HTTP"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+REACHABILITY_KEY_PREFIX = "reachability"
+
+
+def _reachability_key(system_id: int) -> str:
+    return f"{REACHABILITY_KEY_PREFIX}:{system_id}"
+
+
+async def get_cached_result(system_id: int) -> Optional[Dict[str, Any]]:
+    """Último resultado de conexión si sigue vigente (CONNECTION_TEST_TTL)"""
+    raw = await redis_client.get(_reachability_key(system_id))
+    return json.loads(raw) if raw else None
+
+
+async def _apply_results(results: List[Dict[str, Any]]) -> None:
+    """
+    Guarda los resultados: caché por sistema con TTL en Redis y
+    status/reachable/last_checked en la base de datos con dos UPDATE
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for result in results:
+            pipe.set(
+                _reachability_key(result["system_id"]),
+                json.dumps(result, default=str),
+                ex=settings.CONNECTION_TEST_TTL
+            )
+        await pipe.execute()
+
+    checked_at = datetime.utcnow()
+    online = [r["system_id"] for r in results if r["success"]]
+    offline = [r["system_id"] for r in results if not r["success"]]
+
+    async with AsyncSessionLocal() as session:
+        if online:
+            await session.execute(
+                update(System)
+                .where(System.id.in_(online))
+                .values(status="online", reachable=True, last_checked=checked_at)
+            )
+        if offline:
+            await session.execute(
+                update(System)
+                .where(System.id.in_(offline))
+                .values(status="offline", reachable=False, last_checked=checked_at)
+            )
+        await session.commit()
+
+
+async def start_connection_test_job(systems: List[Tuple[int, str]]) -> str:
+    """Crea el trabajo, lo lanza en segundo plano y devuelve su id de inmediato"""
+    job_id = await job_store.create("connection_test", total=len(systems))
+    spawn(run_connection_tests(job_id, systems))
+    return job_id
+
+
+async def run_connection_tests(
+    job_id: str,
+    systems: List[Tuple[int, str]],
+    concurrency: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Prueba la conexión de varios sistemas en paralelo, con un máximo de
+    `concurrency` procesos de Ansible a la vez
+
+    Args:
+        job_id: Trabajo donde se registran los resultados por host
+        systems: Lista de (system_id, nombre)
+        concurrency: Pruebas simultáneas (ANSIBLE_CONNECTION_TEST_CONCURRENCY)
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.ANSIBLE_CONNECTION_TEST_CONCURRENCY)
+
+    async def test(system_id: int, name: str) -> Dict[str, Any]:
+        async with semaphore:
+            result = await ansible_service.test_connection(name)
+
+        entry = {
+            "name": name,
+            "system_id": system_id,
+            "success": bool(result.get("success")),
+            "message": result.get("message", ""),
+            "checked_at": datetime.utcnow(),
+        }
+        await job_store.add_results(job_id, [entry])
+        return entry
+
+    await job_store.start(job_id)
+    try:
+        results = await asyncio.gather(
+            *(test(system_id, name) for system_id, name in systems)
+        )
+        await _apply_results(results)
+    except Exception:
+        logger.exception("Connection test job %s failed", job_id)
+        await job_store.finish(job_id, status="failed")
+        raise
+
+    await job_store.finish(job_id)
+    return results
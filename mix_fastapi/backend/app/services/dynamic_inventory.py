@@ -0,0 +1,127 @@
+"""
+Dynamic Inventory - Genera el inventario de Ansible desde la tabla systems
+"""
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.models.models import System
+
+
+# Grupos que usan los playbooks (hosts: linux / windows / databases)
+GROUP_BY_TYPE = {
+    "linux": "linux",
+    "windows": "windows",
+    "database": "databases",
+}
+
+
+def parse_slot(slot: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta un slot "indice/total" (por ejemplo "0/4")
+
+    Permite repartir la flota entre varios recolectores: cada uno recibe
+    los sistemas cuyo id % total == indice.
+    """
+    if not slot:
+        return None
+
+    try:
+        index, total = (int(part) for part in slot.split("/", 1))
+    except ValueError:
+        raise ValueError(f"Slot inválido: {slot!r} (formato esperado: indice/total)")
+
+    if total < 1 or not 0 <= index < total:
+        raise ValueError(f"Slot fuera de rango: {slot!r}")
+
+    return index, total
+
+
+def build_query(
+    system_type: Optional[str] = None,
+    status: Optional[str] = None,
+    slot: Optional[str] = None
+):
+    """Consulta de sistemas con los filtros estilo --limit"""
+    query = select(
+        System.id,
+        System.name,
+        System.type,
+        System.status,
+        System.ip_address,
+        System.ansible_user,
+        System.ansible_port,
+        System.ansible_connection,
+    )
+
+    if system_type:
+        query = query.filter(System.type == system_type)
+    if status:
+        query = query.filter(System.status == status)
+
+    parsed_slot = parse_slot(slot)
+    if parsed_slot:
+        index, total = parsed_slot
+        query = query.filter(System.id % total == index)
+
+    return query.order_by(System.id)
+
+
+def _value(value: Any) -> Any:
+    """Los Enum de SQLAlchemy llegan como miembros, el inventario usa su valor"""
+    return getattr(value, "value", value)
+
+
+def build_inventory(rows: Iterable[Any]) -> Dict[str, Any]:
+    """Convierte filas de sistemas al formato JSON de inventario dinámico"""
+    inventory: Dict[str, Any] = {
+        "_meta": {"hostvars": {}},
+        "all": {"children": sorted(set(GROUP_BY_TYPE.values()))},
+    }
+    for group in GROUP_BY_TYPE.values():
+        inventory[group] = {"hosts": []}
+
+    for row in rows:
+        system_type = _value(row.type)
+        status = _value(row.status)
+        group = GROUP_BY_TYPE.get(system_type, system_type)
+
+        host_vars = {
+            "ansible_host": row.ip_address,
+            "ansible_user": row.ansible_user,
+            "ansible_port": row.ansible_port,
+            "ansible_connection": row.ansible_connection,
+            "system_id": row.id,
+            "system_type": system_type,
+            "system_status": status,
+        }
+        if row.ansible_connection == "winrm":
+            host_vars["ansible_winrm_server_cert_validation"] = "ignore"
+            host_vars["ansible_winrm_transport"] = "ntlm"
+
+        inventory["_meta"]["hostvars"][row.name] = host_vars
+        inventory.setdefault(group, {"hosts": []})["hosts"].append(row.name)
+        inventory.setdefault(f"status_{status}", {"hosts": []})["hosts"].append(row.name)
+
+    return inventory
+
+
+class InventoryCache:
+    """Caché en memoria con TTL corto, por combinación de filtros"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def set(self, key: Tuple, inventory: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic(), inventory)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,98 @@
+"""
+Heartbeats - Último dato recibido por sistema en un sorted set de Redis
+
+La ingesta registra cada sistema en el ZSET "heartbeats" (miembro: id,
+score: epoch del dato). El estado se calcula al momento con ZMSCORE y los
+sistemas que cruzaron un umbral se obtienen con ZRANGEBYSCORE en
+O(log n + k). El barrido de mantenimiento vuelca last_seen/status a
+PostgreSQL periódicamente.
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+HEARTBEATS_KEY = "heartbeats"
+# Epoch del último volcado a PostgreSQL (barrido incremental)
+SWEPT_AT_KEY = "heartbeats:swept_at"
+# Epoch del último barrido completo por SQL
+FULL_SWEEP_AT_KEY = "heartbeats:full_sweep_at"
+
+
+def status_for(seen_at: float, now: float) -> str:
+    """online / warning / offline según la antigüedad del último dato"""
+    age = now - seen_at
+    if age < settings.SYSTEM_WARNING_AFTER:
+        return "online"
+    if age < settings.SYSTEM_OFFLINE_AFTER:
+        return "warning"
+    return "offline"
+
+
+class HeartbeatIndex:
+    """Lecturas y escrituras del ZSET desde la API (cliente async)"""
+
+    async def record(self, system_ids: Iterable[int], seen_at: float) -> bool:
+        """
+        Registra datos recibidos; devuelve False si Redis no está disponible
+        (el llamador entonces actualiza last_seen en la base de datos)
+        """
+        mapping = {str(system_id): seen_at for system_id in set(system_ids)}
+        if not mapping:
+            return True
+
+        try:
+            # GT: un dato atrasado no retrocede el heartbeat
+            await redis_client.zadd(HEARTBEATS_KEY, mapping, gt=True)
+        except RedisError as e:
+            logger.warning(f"No se pudo registrar el heartbeat en Redis: {e!r}")
+            return False
+        return True
+
+    async def last_seen(self, system_ids: List[int]) -> Dict[int, float]:
+        """Epoch del último dato por sistema (solo los que tienen heartbeat)"""
+        if not system_ids:
+            return {}
+
+        try:
+            scores = await redis_client.zmscore(HEARTBEATS_KEY, [str(i) for i in system_ids])
+        except RedisError as e:
+            logger.warning(f"No se pudieron leer heartbeats de Redis: {e!r}")
+            return {}
+
+        return {
+            system_id: score
+            for system_id, score in zip(system_ids, scores)
+            if score is not None
+        }
+
+    async def overlay(self, systems: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Datos de sistemas (esquema System) con status/last_seen tomados de
+        Redis cuando el heartbeat es más reciente que lo guardado en la BD
+        """
+        seen = await self.last_seen([system["id"] for system in systems])
+        now = time.time()
+
+        for system in systems:
+            seen_at = seen.get(system["id"])
+            if seen_at is None:
+                continue
+            last_seen = datetime.utcfromtimestamp(seen_at)
+            if system["last_seen"] is None or last_seen >= system["last_seen"]:
+                system["last_seen"] = last_seen
+                system["status"] = status_for(seen_at, now)
+
+        return systems
+
+
+# Instancia única del servicio
+heartbeat_index = HeartbeatIndex()
@@ -0,0 +1,224 @@
+"""
+Inventory Store - Acceso indexado, cacheado y seguro entre procesos al hosts.yml de Ansible
+"""
+import fcntl
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+
+# host -> (grupo, nodo del grupo, contenedor del grupo)
+HostLocation = Tuple[str, Dict[str, Any], Dict[str, Any]]
+
+
+class InventoryStore:
+    """
+    Inventario YAML con índice en memoria por host
+
+    - El archivo solo se vuelve a leer cuando cambian su mtime o tamaño
+    - Las modificaciones se hacen dentro de transaction(), que toma un
+      lock de archivo (compartido entre workers) y escribe una sola vez
+      al final mediante archivo temporal + rename atómico
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(f".{self.path.name}.lock")
+        self._inventory: Dict[str, Any] = {}
+        self._index: Dict[str, HostLocation] = {}
+        self._groups: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self._dirty = False
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self) -> None:
+        """Recarga el inventario solo si el archivo cambió desde la última lectura"""
+        if self._depth:
+            # Dentro de una transacción la copia en memoria es la vigente
+            return
+
+        signature = self._file_signature()
+        if self._loaded and signature == self._signature:
+            return
+
+        if signature is None:
+            self._inventory = {}
+        else:
+            with open(self.path, "r") as f:
+                self._inventory = yaml.safe_load(f) or {}
+
+        self._signature = signature
+        self._loaded = True
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        self._index = {}
+        self._groups = {}
+        for group, node in self._inventory.items():
+            self._index_group(group, node, self._inventory)
+
+    def _index_group(self, group: str, node: Any, container: Dict[str, Any]) -> None:
+        """Indexa los hosts de un grupo y de sus grupos hijos"""
+        if not isinstance(node, dict):
+            return
+
+        self._groups.setdefault(group, (node, container))
+        for host in (node.get("hosts") or {}):
+            self._index[host] = (group, node, container)
+
+        children = node.get("children") or {}
+        for child_group, child_node in children.items():
+            self._index_group(child_group, child_node, children)
+
+    def get_host(self, name: str) -> Optional[Dict[str, Any]]:
+        """Variables de un host, o None si no está en el inventario"""
+        with self._thread_lock:
+            self._refresh()
+            location = self._index.get(name)
+            if location is None:
+                return None
+            return dict(location[1]["hosts"][name] or {})
+
+    def get_group(self, name: str) -> Optional[str]:
+        """Grupo al que pertenece un host"""
+        with self._thread_lock:
+            self._refresh()
+            location = self._index.get(name)
+            return location[0] if location else None
+
+    def hosts(self, group: Optional[str] = None) -> List[str]:
+        """Nombres de los hosts, opcionalmente filtrados por grupo"""
+        with self._thread_lock:
+            self._refresh()
+            return [
+                host for host, (host_group, _, _) in self._index.items()
+                if group is None or host_group == group
+            ]
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def transaction(self) -> Iterator["InventoryStore"]:
+        """
+        Agrupa modificaciones bajo el lock de archivo y las guarda una sola vez
+
+        Uso:
+            with store.transaction() as inventory:
+                inventory.upsert_host("linux_servers", "web-01", {...})
+                inventory.remove_host("web-02")
+        """
+        with self._thread_lock:
+            if self._depth:
+                # Transacción anidada: se guarda al cerrar la externa
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    # Otro proceso pudo haber escrito mientras esperábamos el lock
+                    self._refresh()
+                    self._depth = 1
+                    try:
+                        yield self
+                    except BaseException:
+                        # Descartar cambios parciales, se recargan del archivo
+                        self._loaded = False
+                        raise
+                    finally:
+                        self._depth = 0
+                    if self._dirty:
+                        try:
+                            self._write()
+                        except BaseException:
+                            # El archivo no cambió: la copia en memoria ya no
+                            # coincide con él y se recarga en la próxima lectura
+                            self._loaded = False
+                            raise
+                finally:
+                    self._dirty = False
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def upsert_host(self, group: str, name: str, host_vars: Dict[str, Any]) -> None:
+        """Agrega o reemplaza un host (debe llamarse dentro de transaction())"""
+        location = self._index.get(name)
+        if location is not None and location[0] != group:
+            self.remove_host(name)
+
+        # Reutilizar el grupo si ya existe (también bajo all.children)
+        if group in self._groups:
+            group_node, container = self._groups[group]
+        else:
+            group_node, container = {"hosts": {}}, self._inventory
+            self._inventory[group] = group_node
+            self._groups[group] = (group_node, container)
+
+        if group_node.get("hosts") is None:
+            group_node["hosts"] = {}
+
+        group_node["hosts"][name] = host_vars
+        self._index[name] = (group, group_node, container)
+        self._dirty = True
+
+    def remove_host(self, name: str) -> bool:
+        """Elimina un host (debe llamarse dentro de transaction())"""
+        location = self._index.pop(name, None)
+        if location is None:
+            return False
+
+        group, group_node, container = location
+        del group_node["hosts"][name]
+
+        # Si el grupo queda vacío, eliminarlo
+        if not group_node["hosts"] and set(group_node) == {"hosts"}:
+            del container[group]
+            self._groups.pop(group, None)
+
+        self._dirty = True
+        return True
+
+    def _write(self) -> None:
+        """Escritura atómica: archivo temporal en el mismo directorio + rename"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            if self.path.exists():
+                os.chmod(tmp_path, self.path.stat().st_mode & 0o777)
+            with os.fdopen(fd, "w") as f:
+                yaml.dump(self._inventory, f, default_flow_style=False, sort_keys=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self._signature = self._file_signature()
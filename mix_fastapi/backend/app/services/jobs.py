@@ -0,0 +1,95 @@
+"""
+Job Store - Estado de trabajos en segundo plano compartido entre réplicas (Redis)
+"""
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+
+class JobStore:
+    """
+    Cada trabajo es un hash de Redis con TTL:
+      - "meta": estado general (tipo, total, fechas)
+      - "host:<nombre>": resultado de cada host
+    """
+
+    KEY_PREFIX = "jobs"
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}:{job_id}"
+
+    async def create(self, kind: str, total: int) -> str:
+        """Registra un trabajo nuevo y devuelve su id"""
+        job_id = uuid.uuid4().hex
+        meta = {
+            "kind": kind,
+            "status": "pending",
+            "total": total,
+            "created_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+        }
+
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key(job_id), "meta", json.dumps(meta))
+            pipe.expire(self._key(job_id), self.ttl)
+            await pipe.execute()
+
+        return job_id
+
+    async def _update_meta(self, job_id: str, **changes: Any) -> None:
+        key = self._key(job_id)
+        raw = await redis_client.hget(key, "meta")
+        if raw is None:
+            return
+
+        meta = json.loads(raw)
+        meta.update(changes)
+        await redis_client.hset(key, "meta", json.dumps(meta))
+
+    async def start(self, job_id: str) -> None:
+        await self._update_meta(job_id, status="running")
+
+    async def finish(self, job_id: str, status: str = "completed") -> None:
+        await self._update_meta(
+            job_id, status=status, finished_at=datetime.utcnow().isoformat()
+        )
+
+    async def add_results(self, job_id: str, results: List[Dict[str, Any]]) -> None:
+        """Guarda el resultado de uno o varios hosts"""
+        if not results:
+            return
+
+        await redis_client.hset(
+            self._key(job_id),
+            mapping={
+                f"host:{result['name']}": json.dumps(result, default=str)
+                for result in results
+            }
+        )
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado del trabajo con los resultados disponibles hasta el momento"""
+        data = await redis_client.hgetall(self._key(job_id))
+        if not data or "meta" not in data:
+            return None
+
+        meta = json.loads(data.pop("meta"))
+        results = [json.loads(value) for value in data.values()]
+
+        return {
+            "job_id": job_id,
+            **meta,
+            "completed": len(results),
+            "results": sorted(results, key=lambda result: result["name"]),
+        }
+
+
+# Instancia única del servicio
+job_store = JobStore(ttl=settings.JOB_TTL)
@@ -0,0 +1,137 @@
+"""
+Network Rate Service - Converts cumulative interface counters into per-second rates
+"""
+import logging
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+# Collectors send counters in KB, a 32-bit byte counter wraps at this value
+COUNTER32_MAX_KB = 2 ** 32 / 1024
+
+# (system_id, network_in, network_out, timestamp)
+CounterSample = Tuple[int, float, float, float]
+RatePair = Tuple[Optional[Decimal], Optional[Decimal]]
+
+
+class NetworkRateService:
+    """Keeps the last counter value per system and derives KB/s rates"""
+
+    KEY_PREFIX = "netcounters"
+
+    def __init__(
+        self,
+        backend: str = "redis",
+        max_gap_seconds: int = 900,
+        key_ttl: int = 3600
+    ):
+        self.backend = backend
+        self.max_gap_seconds = max_gap_seconds
+        self.key_ttl = key_ttl
+        self._memory: Dict[int, str] = {}
+
+    async def compute_rates(
+        self,
+        system_id: int,
+        network_in: float,
+        network_out: float,
+        timestamp: Optional[float] = None
+    ) -> RatePair:
+        """
+        Store the new counters for a system and return the rates since the previous sample
+
+        Returns (None, None) for the first sample, after a counter reset
+        or when the previous sample is too old to be meaningful.
+        """
+        sample = (system_id, network_in, network_out, timestamp or time.time())
+        return (await self.compute_rates_many([sample]))[0]
+
+    async def compute_rates_many(self, samples: Sequence[CounterSample]) -> List[RatePair]:
+        """Same as compute_rates for many samples, in a single Redis round-trip"""
+        if not samples:
+            return []
+
+        previous = await self._swap(samples)
+
+        return [
+            self._rates(prev, sample) for prev, sample in zip(previous, samples)
+        ]
+
+    async def _swap(self, samples: Sequence[CounterSample]) -> List[Optional[str]]:
+        """Store every sample and return the value each one replaced"""
+        values = [self._encode(sample) for sample in samples]
+
+        if self.backend == "redis":
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    for sample, value in zip(samples, values):
+                        pipe.set(self._key(sample[0]), value, ex=self.key_ttl, get=True)
+                    return await pipe.execute()
+            except RedisError as e:
+                logger.warning("Redis unavailable for network counters, using memory: %s", e)
+
+        previous = []
+        for sample, value in zip(samples, values):
+            previous.append(self._memory.get(sample[0]))
+            self._memory[sample[0]] = value
+        return previous
+
+    def _rates(self, previous: Optional[str], current: CounterSample) -> RatePair:
+        """Compute (in, out) rates between two samples of the same system"""
+        if not previous:
+            return None, None
+
+        prev_ts, prev_in, prev_out = (float(part) for part in previous.split(":"))
+        _, cur_in, cur_out, cur_ts = current
+        elapsed = cur_ts - prev_ts
+
+        if elapsed <= 0 or elapsed > self.max_gap_seconds:
+            return None, None
+
+        delta_in = self._counter_delta(prev_in, cur_in)
+        delta_out = self._counter_delta(prev_out, cur_out)
+
+        return self._per_second(delta_in, elapsed), self._per_second(delta_out, elapsed)
+
+    @staticmethod
+    def _counter_delta(previous: float, current: float) -> Optional[float]:
+        """Counter increase, handling 32-bit wrap and reboot resets"""
+        if current >= previous:
+            return current - previous
+
+        # Counter went backwards: a wrap only if it was close to the 32-bit limit
+        if COUNTER32_MAX_KB * 0.75 < previous <= COUNTER32_MAX_KB:
+            return COUNTER32_MAX_KB - previous + current
+
+        # Otherwise the interface (or host) was reset, there is no valid delta
+        return None
+
+    @staticmethod
+    def _per_second(delta: Optional[float], elapsed: float) -> Optional[Decimal]:
+        if delta is None:
+            return None
+        return Decimal(str(round(delta / elapsed, 2)))
+
+    def _key(self, system_id: int) -> str:
+        return f"{self.KEY_PREFIX}:{system_id}"
+
+    @staticmethod
+    def _encode(sample: CounterSample) -> str:
+        _, network_in, network_out, timestamp = sample
+        return f"{timestamp}:{float(network_in)}:{float(network_out)}"
+
+
+# Instancia única del servicio
+network_rate_service = NetworkRateService(
+    backend=settings.NETWORK_COUNTER_BACKEND,
+    max_gap_seconds=settings.NETWORK_COUNTER_MAX_GAP,
+    key_ttl=settings.NETWORK_COUNTER_TTL,
+)
@@ -0,0 +1,133 @@
+"""
+Process Output - Lectura incremental y acotada de la salida de subprocesos
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+
+# Callback por línea: (stream, línea) donde stream es "stdout" o "stderr"
+LineCallback = Callable[[str, str], Awaitable[None]]
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class CommandResult:
+    """Resultado de un comando: solo se conserva la cola de la salida"""
+    returncode: int
+    stdout_tail: List[str] = field(default_factory=list)
+    stderr_tail: List[str] = field(default_factory=list)
+    total_bytes: int = 0
+    truncated: bool = False
+
+    @property
+    def stdout(self) -> str:
+        return "\n".join(self.stdout_tail)
+
+    @property
+    def stderr(self) -> str:
+        return "\n".join(self.stderr_tail)
+
+
+async def iter_lines(stream: asyncio.StreamReader, max_line: int) -> AsyncIterator[bytes]:
+    """
+    Devuelve las líneas de un stream sin acumular más de max_line bytes
+
+    Las líneas más largas se recortan y el resto se descarta hasta el
+    siguiente salto de línea.
+    """
+    buffer = b""
+    discarding = False
+
+    while True:
+        chunk = await stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+
+        buffer += chunk
+        while True:
+            newline = buffer.find(b"\n")
+            if newline == -1:
+                break
+            line, buffer = buffer[:newline], buffer[newline + 1:]
+            if discarding:
+                discarding = False
+                continue
+            yield line[:max_line]
+
+        if len(buffer) > max_line:
+            if not discarding:
+                yield buffer[:max_line]
+            buffer = b""
+            discarding = True
+
+    if buffer and not discarding:
+        yield buffer[:max_line]
+
+
+async def run_streaming(
+    cmd: List[str],
+    env: Optional[Dict[str, str]] = None,
+    on_line: Optional[LineCallback] = None,
+    tail_lines: Optional[int] = None,
+    max_line: Optional[int] = None
+) -> CommandResult:
+    """
+    Ejecuta un comando leyendo stdout/stderr línea a línea
+
+    Cada línea se entrega a on_line (para extraer resultados o reenviarla
+    por SSE) y solo las últimas tail_lines se guardan, recortadas, en el
+    resultado. La memoria queda acotada sin importar el tamaño de la salida.
+    """
+    tail_lines = tail_lines or settings.ANSIBLE_OUTPUT_TAIL_LINES
+    max_line = max_line or settings.ANSIBLE_OUTPUT_MAX_LINE
+    tail_line_chars = settings.ANSIBLE_OUTPUT_TAIL_LINE_CHARS
+
+    tails: Dict[str, Deque[str]] = {
+        "stdout": deque(maxlen=tail_lines),
+        "stderr": deque(maxlen=tail_lines),
+    }
+    total_bytes = 0
+    line_counts = {"stdout": 0, "stderr": 0}
+
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env
+    )
+
+    async def consume(name: str, stream: asyncio.StreamReader) -> None:
+        nonlocal total_bytes
+        async for raw in iter_lines(stream, max_line):
+            total_bytes += len(raw) + 1
+            line_counts[name] += 1
+            line = raw.decode(errors="replace").rstrip("\r")
+            tails[name].append(line[:tail_line_chars])
+            if on_line is not None:
+                await on_line(name, line)
+
+    try:
+        await asyncio.gather(
+            consume("stdout", process.stdout),
+            consume("stderr", process.stderr),
+        )
+        returncode = await process.wait()
+    except BaseException:
+        # Cancelado (cliente SSE desconectado, timeout): no dejar procesos huérfanos
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+
+    return CommandResult(
+        returncode=returncode,
+        stdout_tail=list(tails["stdout"]),
+        stderr_tail=list(tails["stderr"]),
+        total_bytes=total_bytes,
+        truncated=any(count > tail_lines for count in line_counts.values()),
+    )
@@ -0,0 +1,44 @@
+"""
+System Stats Service - System counts by status and type in a single query
+"""
+from typing import Any, Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import System, SystemStatus
+
+
+async def get_system_stats(db: AsyncSession) -> Dict[str, Any]:
+    """
+    total, by_status, by_type and by_type_status ({type: {status: count}})
+
+    One row per type with COUNT(*) FILTER (WHERE status = ...) for each
+    status; GROUP BY ROLLUP(type) adds the row with the totals (type NULL).
+    """
+    query = select(
+        System.type,
+        func.count().label("total"),
+        *[
+            func.count().filter(System.status == status).label(status.value)
+            for status in SystemStatus
+        ]
+    ).group_by(func.rollup(System.type))
+
+    stats: Dict[str, Any] = {
+        "total": 0,
+        "by_status": {status.value: 0 for status in SystemStatus},
+        "by_type": {},
+        "by_type_status": {},
+    }
+
+    for row in (await db.execute(query)).mappings():
+        counts = {status.value: row[status.value] for status in SystemStatus}
+        if row["type"] is None:
+            stats["total"] = row["total"]
+            stats["by_status"] = counts
+        else:
+            stats["by_type"][row["type"].value] = row["total"]
+            stats["by_type_status"][row["type"].value] = counts
+
+    return stats
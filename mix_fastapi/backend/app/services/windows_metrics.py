@@ -0,0 +1,56 @@
+"""
+Windows Metrics Parser - Converts the bundled Get-Counter output into metrics
+"""
+from decimal import Decimal
+from typing import Dict
+
+from app.schemas.schemas import MetricCreate, WindowsCounterSample
+
+
+# Counter paths sampled by ansible/playbooks/files/windows_metrics.ps1
+CPU_COUNTER = r"\processor(_total)\% processor time"
+AVAILABLE_MEMORY_COUNTER = r"\memory\available kbytes"
+DISK_FREE_COUNTER = r"\logicaldisk(c:)\% free space"
+
+REQUIRED_COUNTERS = (CPU_COUNTER, AVAILABLE_MEMORY_COUNTER, DISK_FREE_COUNTER)
+
+
+def _normalize_path(path: str) -> str:
+    """Strip the \\\\HOST prefix Get-Counter adds and lowercase the path"""
+    path = path.strip().lower()
+    if path.startswith("\\\\"):
+        path = "\\" + path[2:].split("\\", 1)[-1]
+    return path
+
+
+def _percentage(value: float) -> Decimal:
+    """Clamp to the 0-100 range accepted by MetricBase"""
+    return Decimal(str(round(min(max(value, 0.0), 100.0), 2)))
+
+
+def parse_windows_sample(system_id: int, sample: WindowsCounterSample) -> MetricCreate:
+    """
+    Build a MetricCreate from one Windows counter sample
+
+    Raises:
+        ValueError: if a required counter is missing from the sample
+    """
+    counters: Dict[str, float] = {
+        _normalize_path(counter.path): counter.value for counter in sample.counters
+    }
+
+    missing = [path for path in REQUIRED_COUNTERS if path not in counters]
+    if missing:
+        raise ValueError(f"Missing counters: {', '.join(missing)}")
+
+    available_kb = counters[AVAILABLE_MEMORY_COUNTER]
+    memory_usage = (sample.total_memory_kb - available_kb) / sample.total_memory_kb * 100
+
+    return MetricCreate(
+        system_id=system_id,
+        cpu_usage=_percentage(counters[CPU_COUNTER]),
+        memory_usage=_percentage(memory_usage),
+        disk_usage=_percentage(100 - counters[DISK_FREE_COUNTER]),
+        network_in=Decimal(str(sample.network_in_kb)),
+        network_out=Decimal(str(sample.network_out_kb)),
+    )
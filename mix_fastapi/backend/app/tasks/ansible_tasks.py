@@ -1,100 +1,90 @@
 """
 Ansible Celery Tasks
 """
+import time
+
 import ansible_runner
 from celery import shared_task
 from pathlib import Path
 
 from app.core.config import settings
+from app.tasks.locks import singleton, skipped_result
+from app.tasks.results import new_artifact_id, runner_options, summarize_run
 
 
 PLAYBOOKS_PATH = Path(settings.ANSIBLE_PLAYBOOKS_PATH)
-INVENTORY_PATH = settings.ANSIBLE_INVENTORY_PATH
+
+if settings.ANSIBLE_INVENTORY_SOURCE == "database":
+    INVENTORY_PATH = settings.ANSIBLE_DYNAMIC_INVENTORY_PATH
+else:
+    INVENTORY_PATH = settings.ANSIBLE_INVENTORY_PATH
+
+
+def inventory_envvars(system_type: str) -> dict:
+    """Limit the dynamic inventory to one system type (no-op for hosts.yml)"""
+    return {"INVENTORY_TYPE": system_type}
+
+
+def run_collection(task: str, playbook: str, system_type: str) -> dict:
+    """Run a metrics playbook for one system type, one run at a time"""
+    playbook_path = PLAYBOOKS_PATH / playbook
+
+    with singleton(task, system_type) as acquired:
+        if not acquired:
+            return skipped_result(task, system_type)
+
+        artifact_id = new_artifact_id()
+        started = time.monotonic()
+        result = ansible_runner.run(
+            **runner_options(artifact_id),
+            playbook=str(playbook_path),
+            inventory=INVENTORY_PATH,
+            envvars=inventory_envvars(system_type),
+            quiet=False,
+            verbosity=1,
+            extravars={
+                "api_url": "http://backend:8000/api/v1"
+            }
+        )
+
+    return summarize_run(result, artifact_id, time.monotonic() - started)
 
 
 @shared_task(name="app.tasks.ansible_tasks.collect_linux_metrics")
 def collect_linux_metrics():
     """Collect metrics from Linux servers via Ansible"""
-    playbook_path = PLAYBOOKS_PATH / "linux_metrics.yml"
-    
-    result = ansible_runner.run(
-        private_data_dir="/tmp/ansible",
-        playbook=str(playbook_path),
-        inventory=INVENTORY_PATH,
-        quiet=False,
-        verbosity=1,
-        extravars={
-            "api_url": "http://backend:8000/api/v1"
-        }
-    )
-    
-    return {
-        "status": result.status,
-        "rc": result.rc,
-        "stats": result.stats
-    }
+    return run_collection("collect_linux_metrics", "linux_metrics.yml", "linux")
 
 
 @shared_task(name="app.tasks.ansible_tasks.collect_windows_metrics")
 def collect_windows_metrics():
     """Collect metrics from Windows servers via Ansible"""
-    playbook_path = PLAYBOOKS_PATH / "windows_metrics.yml"
-    
-    result = ansible_runner.run(
-        private_data_dir="/tmp/ansible",
-        playbook=str(playbook_path),
-        inventory=INVENTORY_PATH,
-        quiet=False,
-        verbosity=1,
-        extravars={
-            "api_url": "http://backend:8000/api/v1"
-        }
-    )
-    
-    return {
-        "status": result.status,
-        "rc": result.rc,
-        "stats": result.stats
-    }
+    return run_collection("collect_windows_metrics", "windows_metrics.yml", "windows")
 
 
 @shared_task(name="app.tasks.ansible_tasks.collect_database_metrics")
 def collect_database_metrics():
     """Collect metrics from Database servers via Ansible"""
-    playbook_path = PLAYBOOKS_PATH / "database_metrics.yml"
-    
-    result = ansible_runner.run(
-        private_data_dir="/tmp/ansible",
-        playbook=str(playbook_path),
-        inventory=INVENTORY_PATH,
-        quiet=False,
-        verbosity=1,
-        extravars={
-            "api_url": "http://backend:8000/api/v1"
-        }
-    )
-    
-    return {
-        "status": result.status,
-        "rc": result.rc,
-        "stats": result.stats
-    }
+    return run_collection("collect_database_metrics", "database_metrics.yml", "database")
 
 
 @shared_task(name="app.tasks.ansible_tasks.run_ad_hoc_command")
 def run_ad_hoc_command(host_pattern: str, module: str, module_args: str = ""):
-    """Run ad-hoc Ansible command"""
+    """
+    Run ad-hoc Ansible command
+
+    The module output of each host is not returned: it stays in the
+    artifact store (GET /systems/ansible/runs/{artifact_id}/events).
+    """
+    artifact_id = new_artifact_id()
+    started = time.monotonic()
     result = ansible_runner.run(
-        private_data_dir="/tmp/ansible",
+        **runner_options(artifact_id),
         host_pattern=host_pattern,
         module=module,
         module_args=module_args,
         inventory=INVENTORY_PATH,
         quiet=False
     )
-    
-    return {
-        "status": result.status,
-        "rc": result.rc,
-        "events": [event for event in result.events if event.get("event") == "runner_on_ok"]
-    }
+
+    return summarize_run(result, artifact_id, time.monotonic() - started)
@@ -0,0 +1,142 @@
+"""
+Singleton locks for Celery tasks (Redis)
+"""
+import logging
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_sync_redis
+
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "task_locks"
+STATS_KEY = f"{LOCK_PREFIX}:stats"
+
+# Extend / release only while the lock still belongs to this run
+EXTEND_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+class TaskLock:
+    """
+    Expiring lock for one task and host group
+
+    The lock is taken with SET NX PX and kept alive by a heartbeat thread
+    while the task runs. If the worker dies the heartbeat stops and the
+    lock expires after TASK_LOCK_TTL seconds, so a crash never blocks the
+    next cycle for longer than that.
+    """
+
+    def __init__(self, task: str, group: str, ttl: Optional[int] = None):
+        self.key = f"{LOCK_PREFIX}:{task}:{group}"
+        self.stat_prefix = f"{task}:{group}"
+        self.token = uuid.uuid4().hex
+        self.ttl_ms = (ttl or settings.TASK_LOCK_TTL) * 1000
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _count(self, event: str) -> None:
+        get_sync_redis().hincrby(STATS_KEY, f"{self.stat_prefix}:{event}", 1)
+
+    def acquire(self) -> bool:
+        """Take the lock, or return False if another run holds it"""
+        acquired = bool(get_sync_redis().set(self.key, self.token, nx=True, px=self.ttl_ms))
+        self._count("acquired" if acquired else "skipped")
+
+        if acquired:
+            self._thread = threading.Thread(
+                target=self._heartbeat, name=f"heartbeat-{self.key}", daemon=True
+            )
+            self._thread.start()
+        return acquired
+
+    def _heartbeat(self) -> None:
+        extend = get_sync_redis().register_script(EXTEND_SCRIPT)
+        interval = self.ttl_ms / 1000 / 3
+
+        while not self._stop.wait(interval):
+            try:
+                if not extend(keys=[self.key], args=[self.token, self.ttl_ms]):
+                    # Expired or taken over: another run may already be going
+                    self.lost = True
+                    self._count("lost")
+                    logger.warning(f"Lost lock {self.key} while the task was running")
+                    return
+            except redis.RedisError as e:
+                logger.warning(f"Could not extend lock {self.key}: {e!r}")
+
+    def release(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        get_sync_redis().register_script(RELEASE_SCRIPT)(keys=[self.key], args=[self.token])
+
+
+@contextmanager
+def singleton(task: str, group: str) -> Iterator[bool]:
+    """
+    Run a block at most once at a time per task and host group
+
+    Usage:
+        with singleton("collect_linux_metrics", "linux") as acquired:
+            if not acquired:
+                return skipped_result(...)
+            ...
+
+    A trigger that finds the lock held is skipped: its work is covered by
+    the run already in progress.
+    """
+    lock = TaskLock(task, group)
+    if not lock.acquire():
+        logger.info(f"Skipping {task} for {group}: previous run still in progress")
+        yield False
+        return
+
+    try:
+        yield True
+    finally:
+        lock.release()
+
+
+def skipped_result(task: str, group: str) -> Dict[str, str]:
+    """Celery result of a run skipped because of an overlap"""
+    return {"status": "skipped", "reason": "overlap", "task": task, "group": group}
+
+
+def parse_lock_stats(counters: Dict[str, str], lock_keys: Iterable[str]) -> Dict[str, Dict]:
+    """
+    Group the raw counters by task and host group
+
+    counters: STATS_KEY hash ("<task>:<group>:<event>" -> count)
+    lock_keys: lock keys currently held ("task_locks:<task>:<group>")
+    """
+    stats: Dict[str, Dict] = {}
+    running = {key[len(LOCK_PREFIX) + 1:] for key in lock_keys if key != STATS_KEY}
+
+    for field, value in counters.items():
+        name, _, event = field.rpartition(":")
+        entry = stats.setdefault(name, {"acquired": 0, "skipped": 0, "lost": 0})
+        entry[event] = int(value)
+
+    for name, entry in stats.items():
+        entry["running"] = name in running
+    for name in running:
+        stats.setdefault(name, {"acquired": 0, "skipped": 0, "lost": 0, "running": True})
+
+    return stats
@@ -1,70 +1,319 @@
 """
 Maintenance Celery Tasks
 """
+import logging
+import time
+from collections import Counter
 from celery import shared_task
 from datetime import datetime, timedelta
-from sqlalchemy import select, delete
-from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import (
+    select, delete, update, insert, case, cast, values, column, func, or_,
+    Integer, DateTime
+)
+from sqlalchemy.orm import Session, aliased
+from redis.exceptions import RedisError
 
-from app.core.database import engine
-from app.models.models import Metric, Log, System
+from app.core.config import settings
+from app.core.redis import get_sync_redis
+from app.core.worker_database import WorkerSession
+from app.models.models import Metric, Log, LogLevel, System, SystemStatus
+from app.services.heartbeats import (
+    HEARTBEATS_KEY, SWEPT_AT_KEY, FULL_SWEEP_AT_KEY, status_for
+)
+from app.tasks.locks import singleton, skipped_result
+
+
+logger = logging.getLogger(__name__)
+
+# (system_id, old status, new status)
+Transition = Tuple[int, SystemStatus, SystemStatus]
+
+# Rows per write-back UPDATE (bounds the statement size)
+WRITE_BACK_BATCH = 5000
+
+# Seconds the next sweep re-reads, for heartbeats stamped before this sweep
+# started but written to Redis after it read them (re-applying is a no-op)
+SWEEP_OVERLAP = 5
+
+
+RETENTION_PROGRESS_PREFIX = "retention"
+
+
+def _delete_in_batches(model, cutoff: datetime, resume: bool) -> Tuple[int, bool]:
+    """
+    Delete rows older than cutoff in bounded batches
+    
+    Each batch deletes the RETENTION_BATCH_SIZE oldest rows (by the
+    timestamp index) in its own transaction, then sleeps
+    RETENTION_BATCH_SLEEP seconds so autovacuum and ingest keep up. The run
+    stops after RETENTION_MAX_RUNTIME seconds; progress is kept in the Redis
+    hash retention:<table> and the caller continues it in a new task.
+    
+    Returns (rows deleted in this run, whether nothing is left to delete).
+    """
+    client = get_sync_redis()
+    progress_key = f"{RETENTION_PROGRESS_PREFIX}:{model.__tablename__}"
+    batch_size = settings.RETENTION_BATCH_SIZE
+    
+    if not resume:
+        client.delete(progress_key)
+    client.hset(progress_key, mapping={
+        "status": "running",
+        "cutoff": cutoff.isoformat(),
+        "updated_at": datetime.utcnow().isoformat(),
+    })
+    
+    oldest = (
+        select(model.id)
+        .where(model.timestamp < cutoff)
+        .order_by(model.timestamp)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    stmt = delete(model).where(model.id.in_(oldest)).execution_options(synchronize_session=False)
+    
+    started = time.monotonic()
+    deleted = 0
+    while True:
+        with WorkerSession() as session:
+            count = session.execute(stmt).rowcount
+            session.commit()
+        
+        deleted += count
+        client.hincrby(progress_key, "deleted", count)
+        client.hincrby(progress_key, "batches", 1)
+        client.hset(progress_key, "updated_at", datetime.utcnow().isoformat())
+        
+        if count < batch_size:
+            client.hset(progress_key, "status", "done")
+            return deleted, True
+        
+        if time.monotonic() - started >= settings.RETENTION_MAX_RUNTIME:
+            client.hset(progress_key, "status", "paused")
+            return deleted, False
+        
+        time.sleep(settings.RETENTION_BATCH_SLEEP)
 
 
 @shared_task(name="app.tasks.maintenance_tasks.cleanup_old_metrics")
-def cleanup_old_metrics(days: int = 30):
-    """Delete metrics older than specified days"""
+def cleanup_old_metrics(days: int = 30, resume: bool = False):
+    """Delete metrics older than specified days, in batches"""
     cutoff_date = datetime.utcnow() - timedelta(days=days)
     
-    with Session(engine.sync_engine) as session:
-        result = session.execute(
-            delete(Metric).where(Metric.timestamp < cutoff_date)
-        )
-        session.commit()
-        deleted_count = result.rowcount
+    with singleton("cleanup_old_metrics", "metrics") as acquired:
+        if not acquired:
+            return skipped_result("cleanup_old_metrics", "metrics")
+        
+        deleted_count, finished = _delete_in_batches(Metric, cutoff_date, resume)
+        if not finished:
+            cleanup_old_metrics.apply_async(
+                kwargs={"days": days, "resume": True},
+                countdown=settings.RETENTION_RESUME_DELAY
+            )
     
     return {
         "deleted_metrics": deleted_count,
-        "cutoff_date": cutoff_date.isoformat()
+        "cutoff_date": cutoff_date.isoformat(),
+        "finished": finished
     }
 
 
 @shared_task(name="app.tasks.maintenance_tasks.cleanup_old_logs")
-def cleanup_old_logs(days: int = 90):
-    """Delete logs older than specified days"""
+def cleanup_old_logs(days: int = 90, resume: bool = False):
+    """Delete logs older than specified days, in batches"""
     cutoff_date = datetime.utcnow() - timedelta(days=days)
     
-    with Session(engine.sync_engine) as session:
-        result = session.execute(
-            delete(Log).where(Log.timestamp < cutoff_date)
-        )
-        session.commit()
-        deleted_count = result.rowcount
+    with singleton("cleanup_old_logs", "logs") as acquired:
+        if not acquired:
+            return skipped_result("cleanup_old_logs", "logs")
+        
+        deleted_count, finished = _delete_in_batches(Log, cutoff_date, resume)
+        if not finished:
+            cleanup_old_logs.apply_async(
+                kwargs={"days": days, "resume": True},
+                countdown=settings.RETENTION_RESUME_DELAY
+            )
     
     return {
         "deleted_logs": deleted_count,
-        "cutoff_date": cutoff_date.isoformat()
+        "cutoff_date": cutoff_date.isoformat(),
+        "finished": finished
     }
 
 
+def _changed_heartbeats(client, swept_at: Optional[float], now: float) -> Dict[int, float]:
+    """
+    Heartbeats that may change a system since the previous sweep
+    
+    Three ZRANGEBYSCORE, O(log n + k): new heartbeats, and heartbeats that
+    crossed the warning or offline threshold since swept_at. Without a
+    previous sweep every heartbeat is returned.
+    """
+    if swept_at is None:
+        ranges = [("-inf", "+inf")]
+    else:
+        warning_after = settings.SYSTEM_WARNING_AFTER
+        offline_after = settings.SYSTEM_OFFLINE_AFTER
+        ranges = [
+            (f"({swept_at}", "+inf"),
+            (f"({swept_at - warning_after}", now - warning_after),
+            (f"({swept_at - offline_after}", now - offline_after),
+        ]
+    
+    pipe = client.pipeline(transaction=False)
+    for low, high in ranges:
+        pipe.zrangebyscore(HEARTBEATS_KEY, low, high, withscores=True)
+    
+    heartbeats = {}
+    for rows in pipe.execute():
+        heartbeats.update((int(member), score) for member, score in rows)
+    return heartbeats
+
+
+def _write_back(session: Session, heartbeats: Dict[int, float], now: float) -> List[Transition]:
+    """Copy heartbeat last_seen/status to the systems table with UPDATE ... FROM (VALUES)"""
+    status_type = System.status.type
+    previous = aliased(System)
+    items = list(heartbeats.items())
+    transitions = []
+    
+    for start in range(0, len(items), WRITE_BACK_BATCH):
+        beats = values(
+            column("id", Integer),
+            column("seen_at", DateTime),
+            column("status", status_type),
+            name="beats",
+        ).data([
+            (system_id, datetime.utcfromtimestamp(seen_at), SystemStatus(status_for(seen_at, now)))
+            for system_id, seen_at in items[start:start + WRITE_BACK_BATCH]
+        ])
+        new_status = cast(beats.c.status, status_type)
+        
+        stmt = (
+            update(System)
+            .where(System.id == beats.c.id)
+            .where(previous.id == System.id)
+            .where(or_(
+                System.status != new_status,
+                System.last_seen.is_(None),
+                System.last_seen < beats.c.seen_at,
+            ))
+            .values(status=new_status, last_seen=func.greatest(System.last_seen, beats.c.seen_at))
+            # previous is the row before the update: its status is the old one.
+            # Distinct labels: both columns are named "status" otherwise, and
+            # the ORM keeps only one of them in RETURNING
+            .returning(
+                System.id,
+                previous.status.label("old_status"),
+                new_status.label("new_status"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        transitions.extend(
+            (system_id, old_status, status)
+            for system_id, old_status, status in session.execute(stmt)
+            if old_status != status
+        )
+    
+    return transitions
+
+
+def _full_sweep(session: Session) -> List[Transition]:
+    """
+    Recompute online/warning/offline from last_seen for the whole table
+    
+    Systems that never reported (last_seen NULL) fall through to offline.
+    """
+    now = datetime.utcnow()
+    warning_since = now - timedelta(seconds=settings.SYSTEM_WARNING_AFTER)
+    offline_since = now - timedelta(seconds=settings.SYSTEM_OFFLINE_AFTER)
+    status_type = System.status.type
+    
+    computed = select(
+        System.id,
+        System.status.label("old_status"),
+        case(
+            (System.last_seen >= warning_since, cast(SystemStatus.ONLINE, status_type)),
+            (System.last_seen >= offline_since, cast(SystemStatus.WARNING, status_type)),
+            else_=cast(SystemStatus.OFFLINE, status_type),
+        ).label("new_status"),
+    ).subquery()
+    
+    sweep = (
+        update(System)
+        .where(System.id == computed.c.id)
+        .where(computed.c.old_status != computed.c.new_status)
+        .values(status=computed.c.new_status)
+        .returning(System.id, computed.c.old_status, computed.c.new_status)
+        .execution_options(synchronize_session=False)
+    )
+    
+    return [tuple(row) for row in session.execute(sweep)]
+
+
 @shared_task(name="app.tasks.maintenance_tasks.update_system_statuses")
 def update_system_statuses():
-    """Update system statuses based on last_seen timestamp"""
-    threshold = datetime.utcnow() - timedelta(minutes=10)
+    """
+    Write system status and last_seen back from the Redis heartbeat index
     
-    with Session(engine.sync_engine) as session:
-        # Get all systems
-        result = session.execute(select(System))
-        systems = result.scalars().all()
+    Only systems with new heartbeats or whose heartbeat crossed a threshold
+    since the previous sweep are read from Redis and updated, in one
+    UPDATE ... RETURNING per batch. A full set-based sweep over the table
+    also runs on the first sweep and every HEARTBEAT_FULL_SWEEP_INTERVAL,
+    for systems that never reported to Redis. Transitions are logged with
+    one bulk INSERT.
+    
+    If Redis is down, ingest writes last_seen to the database instead, so
+    the sweep falls back to the full SQL sweep alone.
+    """
+    now = time.time()
+    client = get_sync_redis()
+    
+    try:
+        swept_at, full_sweep_at = client.mget(SWEPT_AT_KEY, FULL_SWEEP_AT_KEY)
+        swept_at = float(swept_at) if swept_at is not None else None
+        full_sweep = (
+            full_sweep_at is None
+            or now - float(full_sweep_at) >= settings.HEARTBEAT_FULL_SWEEP_INTERVAL
+        )
+        heartbeats = _changed_heartbeats(client, swept_at, now)
+        redis_available = True
+    except RedisError as e:
+        logger.warning(f"Heartbeat index unavailable, running the full sweep only: {e!r}")
+        heartbeats, full_sweep, redis_available = {}, True, False
+    
+    with WorkerSession() as session:
+        changes = _write_back(session, heartbeats, now)
+        if full_sweep:
+            changes += _full_sweep(session)
         
-        updated_count = 0
-        for system in systems:
-            if system.last_seen < threshold and system.status != "offline":
-                system.status = "offline"
-                updated_count += 1
+        if changes:
+            session.execute(insert(Log), [
+                {
+                    "system_id": system_id,
+                    "level": LogLevel.WARNING if new_status == SystemStatus.OFFLINE else LogLevel.INFO,
+                    "message": f"System status changed from {old_status.value} to {new_status.value}",
+                    "source": "status_monitor",
+                }
+                for system_id, old_status, new_status in changes
+            ])
         
         session.commit()
     
+    if redis_available:
+        try:
+            client.set(SWEPT_AT_KEY, now - SWEEP_OVERLAP)
+            if full_sweep:
+                client.set(FULL_SWEEP_AT_KEY, now)
+        except RedisError as e:
+            # Not recorded: the next sweep re-reads a wider range (a no-op)
+            logger.warning(f"Could not record the sweep time: {e!r}")
+    
     return {
-        "updated_systems": updated_count,
-        "threshold": threshold.isoformat()
+        "updated_systems": len(changes),
+        "heartbeats": len(heartbeats),
+        "full_sweep": full_sweep,
+        "redis_available": redis_available,
+        "transitions": dict(Counter(new_status.value for _, _, new_status in changes)),
     }
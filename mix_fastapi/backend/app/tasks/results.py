@@ -0,0 +1,95 @@
+"""
+Compact task results for ansible-runner runs
+"""
+import json
+import re
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+
+RUNNER_DIR = Path(settings.ANSIBLE_RUNNER_DIR)
+ARTIFACTS_DIR = RUNNER_DIR / "artifacts"
+
+# ansible-runner stats: status -> {host: count}
+STAT_KEYS = ("ok", "changed", "failures", "dark", "skipped", "ignored", "rescued")
+
+ARTIFACT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def new_artifact_id() -> str:
+    """Run ident: names the run's directory in the artifact store"""
+    return uuid.uuid4().hex
+
+
+def runner_options(artifact_id: str) -> Dict[str, Any]:
+    """
+    Common ansible_runner.run() arguments
+
+    Full events and stdout stay in ARTIFACTS_DIR/<artifact_id>; only the
+    newest ANSIBLE_ARTIFACTS_KEEP runs are kept on disk.
+    """
+    return {
+        "private_data_dir": str(RUNNER_DIR),
+        "ident": artifact_id,
+        "rotate_artifacts": settings.ANSIBLE_ARTIFACTS_KEEP,
+    }
+
+
+def summarize_run(result: Any, artifact_id: str, duration: float) -> Dict[str, Any]:
+    """
+    Small Celery result for a run: host counts per status, duration and
+    failed hosts, with the artifact id to look up the full output
+    """
+    stats = result.stats or {}
+    failed_hosts = sorted(set(stats.get("failures") or {}) | set(stats.get("dark") or {}))
+
+    return {
+        "status": result.status,
+        "rc": result.rc,
+        "duration": round(duration, 2),
+        "hosts": len(stats.get("processed") or {}),
+        "counts": {key: len(stats.get(key) or {}) for key in STAT_KEYS},
+        "failed_hosts": failed_hosts[:settings.TASK_RESULT_MAX_HOSTS],
+        "failed_hosts_truncated": len(failed_hosts) > settings.TASK_RESULT_MAX_HOSTS,
+        "artifact_id": artifact_id,
+    }
+
+
+def load_run_events(
+    artifact_id: str,
+    event: Optional[str] = None,
+    limit: int = 100
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Events of a run read back from the artifact store, in order
+
+    Returns None if the artifact id is unknown or was already rotated out.
+    """
+    if not ARTIFACT_ID.match(artifact_id):
+        return None
+
+    events_dir = ARTIFACTS_DIR / artifact_id / "job_events"
+    if not events_dir.is_dir():
+        return None
+
+    # Files are named "<counter>-<uuid>.json" (skip "*-partial.json")
+    counters = {
+        path: int(path.name.split("-", 1)[0])
+        for path in events_dir.glob("*.json")
+        if path.name.split("-", 1)[0].isdigit()
+    }
+    paths = sorted(counters, key=counters.get)
+
+    events = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        if event is None or data.get("event") == event:
+            events.append(data)
+            if len(events) >= limit:
+                break
+
+    return events